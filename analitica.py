@@ -0,0 +1,200 @@
+from bson import ObjectId
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import os
+import threading
+
+from conexion import resolver
+from metricas import log
+from restricciones import es_producto_restringido
+
+# ------------------ CONFIGURACIÓN ------------------
+LOTE_ANALITICA = int(os.environ.get("SIX_ANALITICA_LOTE", "1000"))
+# Las órdenes más nuevas que esto esperan a la siguiente pasada: un checkout
+# inserta la orden como "pendiente" y la confirma segundos después (gunicorn
+# corta cualquier petición a los SIX_GUNICORN_TIMEOUT s). Cubre también la
+# diferencia de reloj entre servidores, porque el _id lo genera el driver.
+MARGEN_ANALITICA = int(os.environ.get("SIX_ANALITICA_MARGEN", "120"))
+# Con el tablero abierto, cada cuánto se procesan las órdenes nuevas
+INTERVALO_ANALITICA = int(os.environ.get("SIX_ANALITICA_INTERVALO", "60"))
+TURNO_ANALITICA = 300
+
+# ------------------ COLECCIONES DE RESUMEN ------------------
+# ventas_dias/{_id: "AAAA-MM-DD"}: ordenes, ordenes_restringidas, ingresos, unidades
+# ventas_categorias/{_id: "AAAA-MM-DD|categoria"}: dia, categoria, ingresos, unidades
+# ventas_productos/{_id: producto_id}: name, category, restringido, unidades, ingresos
+# meta/analitica: marca (último _id de pagos procesado), actualizado, ocupado_hasta
+#
+# Los _id de días y categorías empiezan por la fecha, así que un rango de
+# días es un rango sobre el índice _id. El tablero lee a lo sumo
+# días × categorías documentos sin importar cuántas órdenes haya en pagos.
+COLECCIONES = ("ventas_dias", "ventas_categorias", "ventas_productos")
+
+_CONFIRMADAS = {"estado": {"$ne": "pendiente"}}
+_PROYECCION_ORDEN = {
+    "fecha_compra": 1, "total": 1,
+    "carrito._id": 1, "carrito.name": 1, "carrito.price": 1, "carrito.category": 1,
+    "carrito.cantidad": 1, "carrito.restringido": 1,
+}
+
+def _dia(fecha):
+    return fecha.strftime("%Y-%m-%d")
+
+def _acumular(ordenes):
+    dias = defaultdict(Counter)
+    categorias = defaultdict(Counter)
+    productos = defaultdict(Counter)
+    fijos = {}
+    for orden in ordenes:
+        dia = _dia(orden["fecha_compra"])
+        restringida = False
+        for item in orden.get("carrito", []):
+            unidades = item.get("cantidad", 1)
+            ingresos = item.get("price", 0) * unidades
+            categoria = item.get("category", "")
+            restringido = es_producto_restringido(item)
+            restringida = restringida or restringido
+
+            dias[dia]["unidades"] += unidades
+            clave = f"{dia}|{categoria}"
+            categorias[clave].update(ingresos=ingresos, unidades=unidades)
+            fijos[clave] = {"dia": dia, "categoria": categoria}
+            productos[item["_id"]].update(ingresos=ingresos, unidades=unidades)
+            fijos[item["_id"]] = {"name": item.get("name", ""), "category": categoria,
+                                  "restringido": restringido}
+        dias[dia].update(ordenes=1, ingresos=orden.get("total", 0),
+                         ordenes_restringidas=int(restringida))
+    return {"ventas_dias": dias, "ventas_categorias": categorias, "ventas_productos": productos}, fijos
+
+def _aplicar(coleccion, acumulados, fijos, marca):
+    # Cada documento guarda la marca del último lote que sumó. Si el mismo
+    # lote se aplica otra vez (caída entre este paso y mover la marca de
+    # meta), el filtro no encuentra el documento, el upsert choca con el _id
+    # existente (11000) y no se suma dos veces.
+    operaciones = [
+        UpdateOne({"_id": clave, "marca": {"$lt": marca}},
+                  {"$inc": dict(sumas), "$set": dict(fijos.get(clave, {}), marca=marca)},
+                  upsert=True)
+        for clave, sumas in acumulados.items()
+    ]
+    if not operaciones:
+        return
+    try:
+        coleccion.bulk_write(operaciones, ordered=False)
+    except BulkWriteError as e:
+        if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+            raise
+
+# ------------------ ACTUALIZACIÓN POR MARCA DE AGUA ------------------
+def _tomar_turno(meta):
+    # Un solo proceso a la vez: dos pasadas con lotes distintos sí podrían
+    # sumar una orden dos veces
+    ahora = datetime.now()
+    try:
+        return meta.find_one_and_update(
+            {"_id": "analitica", "$or": [{"ocupado_hasta": {"$exists": False}},
+                                         {"ocupado_hasta": {"$lt": ahora}}]},
+            {"$set": {"ocupado_hasta": ahora + timedelta(seconds=TURNO_ANALITICA)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        return None
+
+def actualizar_analitica(db, lote=None, margen=None, desde_cero=False):
+    # Procesa las órdenes confirmadas con _id mayor que la marca, en lotes y
+    # en orden de _id. Devuelve cuántas procesó, o None si otro proceso
+    # está actualizando. desde_cero borra los resúmenes y recorre todo pagos.
+    lote = lote or LOTE_ANALITICA
+    margen = MARGEN_ANALITICA if margen is None else margen
+    meta = db["meta"]
+    turno = _tomar_turno(meta)
+    if turno is None:
+        return None
+    if desde_cero:
+        for nombre in COLECCIONES:
+            db[nombre].delete_many({})
+        turno["marca"] = None
+
+    marca = turno.get("marca") or ObjectId("0" * 24)
+    limite = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(seconds=margen))
+    procesadas = 0
+    try:
+        while True:
+            ordenes = list(db["pagos"].find(
+                dict(_CONFIRMADAS, _id={"$gt": marca, "$lt": limite}), _PROYECCION_ORDEN
+            ).sort("_id", 1).limit(lote))
+            if not ordenes:
+                break
+            marca = ordenes[-1]["_id"]
+            acumulados, fijos = _acumular(ordenes)
+            for nombre, sumas in acumulados.items():
+                _aplicar(db[nombre], sumas, fijos, marca)
+            meta.update_one({"_id": "analitica"}, {"$set": {
+                "marca": marca,
+                "ocupado_hasta": datetime.now() + timedelta(seconds=TURNO_ANALITICA),
+            }})
+            procesadas += len(ordenes)
+    finally:
+        meta.update_one({"_id": "analitica"}, {"$set": {"actualizado": datetime.now()},
+                                               "$unset": {"ocupado_hasta": ""}})
+    return procesadas
+
+_refresco = {"hilo": None}
+_lock = threading.Lock()
+
+def _actualizar_seguro(db):
+    try:
+        procesadas = actualizar_analitica(db)
+        if procesadas:
+            log.info("Analítica: %d órdenes nuevas procesadas", procesadas)
+    except Exception:
+        log.exception("Error al actualizar la analítica")
+
+def refrescar_si_vieja(db, actualizado):
+    # La llama el tablero: si la última pasada es más vieja que el
+    # intervalo, se lanza otra en segundo plano y la página no la espera.
+    # Sin tablero abierto basta `flask --app app actualizar-analitica` en un cron.
+    if actualizado and datetime.now() - actualizado < timedelta(seconds=INTERVALO_ANALITICA):
+        return
+    with _lock:
+        if _refresco["hilo"] is not None and _refresco["hilo"].is_alive():
+            return
+        _refresco["hilo"] = threading.Thread(target=_actualizar_seguro, args=(resolver(db),), daemon=True)
+        _refresco["hilo"].start()
+
+# ------------------ TABLERO ------------------
+def tablero(db, dias=30, top=10):
+    desde = _dia(datetime.now() - timedelta(days=dias - 1))
+    por_dia = list(db["ventas_dias"].find({"_id": {"$gte": desde}}, {"marca": 0}).sort("_id", 1))
+    por_categoria_dia = list(db["ventas_categorias"].find(
+        {"_id": {"$gte": desde}}, {"_id": 0, "marca": 0}
+    ).sort("_id", 1))
+    mas_vendidos = list(db["ventas_productos"].find({}, {"marca": 0}).sort("unidades", -1).limit(top))
+
+    totales = Counter()
+    for dia in por_dia:
+        totales.update({campo: dia.get(campo, 0) for campo in
+                        ("ordenes", "ordenes_restringidas", "ingresos", "unidades")})
+    categorias = defaultdict(Counter)
+    for fila in por_categoria_dia:
+        categorias[fila["categoria"]].update(ingresos=fila["ingresos"], unidades=fila["unidades"])
+
+    meta = db["meta"].find_one({"_id": "analitica"}, {"actualizado": 1}) or {}
+    return {
+        "dias": dias,
+        "desde": desde,
+        "actualizado": meta.get("actualizado"),
+        "ordenes": totales["ordenes"],
+        "ingresos": totales["ingresos"],
+        "unidades": totales["unidades"],
+        "participacion_restringidos": (totales["ordenes_restringidas"] / totales["ordenes"]
+                                       if totales["ordenes"] else 0),
+        "por_dia": por_dia,
+        "por_categoria": sorted(({"categoria": categoria, **sumas} for categoria, sumas in categorias.items()),
+                                key=lambda fila: -fila["ingresos"]),
+        "por_categoria_dia": por_categoria_dia,
+        "mas_vendidos": mas_vendidos,
+    }
@@ -0,0 +1,162 @@
+from flask import abort, request, send_file, url_for
+from werkzeug.security import safe_join
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+
+# ------------------ CONFIGURACIÓN ------------------
+BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flask_mongo_crud_alumnos")
+# nombre lógico (prefijo) -> carpeta de origen. La copia de bootstrap-main
+# trae los mismos archivos que templates/assets; al publicar se guarda una
+# sola vez por contenido.
+FUENTES = {
+    "": os.path.join(BASE, "static"),
+    "assets/": os.path.join(BASE, "templates", "assets"),
+    "bootstrap-main/": os.path.join(BASE, "templates", "bootstrap-main", "bootstrap-main", "assets"),
+}
+DIR_DIST = os.path.join(BASE, "static", "dist")
+MANIFEST = os.path.join(DIR_DIST, "manifest.json")
+
+EXTENSIONES = {".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".webp"}
+# Solo vale la pena comprimir texto; las imágenes ya vienen comprimidas
+COMPRIMIBLES = {".css", ".js", ".svg"}
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+# Cada cuánto se revisa si alguna fuente es más nueva que manifest.json
+# (CSS o JS editados con `flask run` levantado). 0 lo desactiva.
+INTERVALO_REVISION = float(os.environ.get("SIX_ASSETS_REVISION", "2"))
+
+# ------------------ MINIFICACIÓN ------------------
+_COMENTARIO_CSS = re.compile(r"/\*(?!!).*?\*/", re.S)
+_ESPACIOS = re.compile(r"\s+")
+_ALREDEDOR = re.compile(r"\s*([{};,>])\s*")
+
+def minificar_css(css):
+    # Conservadora: quita comentarios (menos los /*! de licencia) y espacios
+    # sobrantes, sin tocar valores como calc(100% - 1rem)
+    css = _COMENTARIO_CSS.sub("", css)
+    css = _ESPACIOS.sub(" ", css)
+    css = _ALREDEDOR.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+def _minificar(extension, datos):
+    if extension == ".css":
+        return minificar_css(datos.decode("utf-8")).encode("utf-8")
+    if extension == ".js":
+        try:
+            import rjsmin
+        except ImportError:
+            return datos
+        return rjsmin.jsmin(datos.decode("utf-8")).encode("utf-8")
+    return datos
+
+def _escribir(ruta, datos):
+    # Escritura atómica: varios workers pueden construir a la vez y nadie
+    # debe servir un archivo a medias
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as salida:
+        salida.write(datos)
+    os.replace(temporal, ruta)
+
+def _comprimir(ruta, datos):
+    _escribir(ruta + ".gz", gzip.compress(datos, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    _escribir(ruta + ".br", brotli.compress(datos, quality=11))
+
+# ------------------ CONSTRUCCIÓN ------------------
+def _fuentes():
+    for prefijo, carpeta in FUENTES.items():
+        for raiz, carpetas, archivos in os.walk(carpeta):
+            carpetas[:] = [c for c in carpetas if os.path.join(raiz, c) != DIR_DIST]
+            for archivo in sorted(archivos):
+                if os.path.splitext(archivo)[1].lower() in EXTENSIONES:
+                    yield prefijo, carpeta, os.path.join(raiz, archivo)
+
+def _fuente_mas_nueva():
+    return max((os.path.getmtime(origen) for _, _, origen in _fuentes()), default=0)
+
+def construir():
+    # Devuelve el manifest {nombre lógico: archivo publicado}. Los nombres
+    # llevan la huella del contenido, así que reconstruir es idempotente.
+    os.makedirs(DIR_DIST, exist_ok=True)
+
+    manifest = {}
+    publicados = {}
+    for prefijo, carpeta, origen in _fuentes():
+        base, extension = os.path.splitext(os.path.basename(origen))
+        extension = extension.lower()
+        logico = prefijo + os.path.relpath(origen, carpeta).replace(os.sep, "/")
+        with open(origen, "rb") as entrada:
+            datos = _minificar(extension, entrada.read())
+
+        huella = hashlib.sha256(datos).hexdigest()[:12]
+        if huella not in publicados:
+            nombre = f"{re.sub(r'[^A-Za-z0-9_-]+', '-', base)}.{huella}{extension}"
+            destino = os.path.join(DIR_DIST, nombre)
+            _escribir(destino, datos)
+            if extension in COMPRIMIBLES:
+                _comprimir(destino, datos)
+            publicados[huella] = nombre
+        manifest[logico] = publicados[huella]
+
+    _escribir(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    _manifest.update(datos=manifest, generado=os.path.getmtime(MANIFEST), revisado=time.monotonic())
+    return manifest
+
+_manifest = {"datos": None, "generado": 0, "revisado": 0}
+_lock = threading.Lock()
+
+def _vencido():
+    # Un manifest.json más viejo que alguna fuente apunta a huellas de
+    # contenido que ya no existe: se reconstruye en vez de confiar en él
+    if _manifest["datos"] is None:
+        return True
+    if not INTERVALO_REVISION or time.monotonic() - _manifest["revisado"] < INTERVALO_REVISION:
+        return False
+    _manifest["revisado"] = time.monotonic()
+    return _fuente_mas_nueva() > _manifest["generado"]
+
+def _cargar():
+    with open(MANIFEST) as entrada:
+        _manifest.update(datos=json.load(entrada), generado=os.path.getmtime(MANIFEST),
+                         revisado=time.monotonic())
+
+def manifest():
+    if _vencido():
+        with _lock:
+            fuente = _fuente_mas_nueva()
+            if _manifest["datos"] is None and os.path.exists(MANIFEST) and os.path.getmtime(MANIFEST) >= fuente:
+                _cargar()
+            elif _manifest["datos"] is None or fuente > _manifest["generado"]:
+                construir()
+    return _manifest["datos"]
+
+# ------------------ USO DESDE FLASK ------------------
+def url_asset(nombre):
+    # En plantillas: {{ asset('css/inicio.css') }}
+    return url_for("estado.servir_asset", archivo=manifest()[nombre])
+
+def respuesta_asset(archivo):
+    ruta = safe_join(DIR_DIST, archivo)
+    if ruta is None or archivo == "manifest.json" or not os.path.isfile(ruta):
+        abort(404)
+
+    tipo = mimetypes.guess_type(ruta)[0]
+    for codificacion, extension in (("br", ".br"), ("gzip", ".gz")):
+        if request.accept_encodings[codificacion] and os.path.exists(ruta + extension):
+            respuesta = send_file(ruta + extension, mimetype=tipo, conditional=True)
+            respuesta.headers["Content-Encoding"] = codificacion
+            break
+    else:
+        respuesta = send_file(ruta, mimetype=tipo, conditional=True)
+
+    respuesta.headers["Vary"] = "Accept-Encoding"
+    respuesta.headers["Cache-Control"] = CACHE_INMUTABLE
+    return respuesta
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from pymongo import MongoClient
+import os
+import resource
+import time
+
+from importacion import CATEGORIAS, MARCAS, productos_sinteticos
+
+# Los benchmarks corren contra un mongod local (o mongomock:// para pruebas
+# rápidas), nunca contra la base de producción.
+MONGO_URI = os.environ.get("SIX_BENCH_MONGO_URI", "mongodb://localhost:27017/six_bench")
+
+def conectar():
+    if MONGO_URI.startswith("mongomock://"):
+        import mongomock
+        return mongomock.MongoClient()["six_bench"]
+    return MongoClient(MONGO_URI).get_default_database()
+
+def sembrar_productos(coleccion, n, lote=10000):
+    coleccion.delete_many({})
+    buffer = []
+    for doc in productos_sinteticos(n):
+        buffer.append(doc)
+        if len(buffer) >= lote:
+            coleccion.insert_many(buffer, ordered=False)
+            buffer = []
+    if buffer:
+        coleccion.insert_many(buffer, ordered=False)
+
+def sembrar_usuarios(usuarios, n, contrasena="secreto123", prefijo="bench_"):
+    # Un solo hash scrypt para todos: sembrar no debe tardar n * 50 ms
+    from credenciales import hashear
+    hash_contrasena = hashear(contrasena)
+    nacimiento = datetime(1990, 1, 1)
+    usuarios.delete_many({"usuario": {"$regex": f"^{prefijo}"}})
+    nombres = [f"{prefijo}{i:06d}" for i in range(n)]
+    for inicio in range(0, n, 10000):
+        usuarios.insert_many([{
+            "usuario": nombre,
+            "contrasena": hash_contrasena,
+            "fecha_nacimiento": nacimiento,
+            "mayor_desde": datetime(2008, 1, 1),
+            "fecha_registro": nacimiento,
+        } for nombre in nombres[inicio:inicio + 10000]])
+    return nombres
+
+def sembrar_ordenes(pagos, usuario, n, lote=5000):
+    pagos.delete_many({"usuario": usuario})
+    inicio = datetime(2020, 1, 1)
+    buffer = []
+    for i in range(n):
+        buffer.append({
+            "usuario": usuario,
+            "carrito": [{"_id": str(j), "name": f"Producto {j}", "price": 25.0, "img": "x" * 80,
+                         "category": "dulces", "cantidad": 2} for j in range(8)],
+            "total": 400.0,
+            "fecha_compra": inicio + timedelta(minutes=i),
+            "numero_orden": f"BENCH-{usuario}-{i:09d}",
+            "estado": "confirmada",
+        })
+        if len(buffer) >= lote:
+            pagos.insert_many(buffer)
+            buffer = []
+    if buffer:
+        pagos.insert_many(buffer)
+
+def rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def cronometrar(funcion, repeticiones=1):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[k]
@@ -0,0 +1,152 @@
+# Tablero de analítica con `pagos` creciendo: latencia leyendo las
+# colecciones de resumen contra la misma información agregada directamente
+# sobre pagos en cada visita, y costo de la pasada incremental que solo
+# procesa las órdenes nuevas. Necesita un mongod real para los millones.
+#
+# Antes del primer tamaño se siembra una orden por cada día del historial,
+# categoría y producto: desde la primera fila existen todos los documentos
+# de resumen que puede haber, y la columna "docs" (lo que lee el tablero)
+# queda fija. Sin eso la curva sube mientras se llenan los días × categorías
+# y lo que se mide es el llenado, no el tamaño de pagos.
+#
+#   python -m bench.analitica --tamanos 10000 100000 1000000 3000000
+#   SIX_BENCH_MONGO_URI=mongomock:// python -m bench.analitica --productos 500 --tamanos 4000 8000 16000
+import argparse
+import gc
+import random
+import time
+from datetime import datetime, timedelta
+
+from analitica import COLECCIONES, actualizar_analitica, tablero
+from bench._comun import CATEGORIAS, conectar, cronometrar
+from indices import crear_indices
+
+PRODUCTOS = 5000
+DIAS_HISTORIA = 365
+
+def _item(j, cantidad):
+    return {"_id": f"bench-{j:05d}", "name": f"Producto {j}", "price": float(10 + j % 90),
+            "category": CATEGORIAS[j % len(CATEGORIAS)], "cantidad": cantidad}
+
+def _orden(usuario, carrito, fecha):
+    return {
+        "usuario": usuario,
+        "carrito": carrito,
+        "total": sum(item["price"] * item["cantidad"] for item in carrito),
+        "fecha_compra": fecha,
+        "estado": "confirmada",
+    }
+
+def _insertar(pagos, ordenes, lote=10000):
+    buffer = []
+    for orden in ordenes:
+        buffer.append(orden)
+        if len(buffer) >= lote:
+            pagos.insert_many(buffer, ordered=False)
+            buffer = []
+    if buffer:
+        pagos.insert_many(buffer, ordered=False)
+
+def sembrar_ordenes_mixtas(pagos, n, semilla, productos=PRODUCTOS):
+    # Órdenes del último año, de 1 a 5 productos de un catálogo de `productos`
+    azar = random.Random(semilla)
+    ahora = datetime.now()
+    _insertar(pagos, (
+        _orden(f"bench_{azar.randrange(100000):06d}",
+               [_item(azar.randrange(productos), azar.randint(1, 3)) for _ in range(azar.randint(1, 5))],
+               ahora - timedelta(minutes=azar.randrange(DIAS_HISTORIA * 24 * 60)))
+        for _ in range(n)
+    ))
+
+def sembrar_resumen_lleno(pagos, productos=PRODUCTOS):
+    # Una orden de un producto por cada producto y por cada combinación
+    # día × categoría del historial: tras procesarlas ya existen todos los
+    # documentos de ventas_dias, ventas_categorias y ventas_productos que
+    # pueden generar las órdenes mixtas. Devuelve cuántas sembró.
+    ahora = datetime.now()
+    categorias = len(CATEGORIAS)
+    # (producto, días atrás); el producto j es de la categoría j % categorias.
+    # Las mixtas llegan hasta DIAS_HISTORIA días atrás, ese día incluido.
+    combinaciones = [(j, j % DIAS_HISTORIA) for j in range(productos)]
+    combinaciones += [(c + categorias * (dia % (productos // categorias)), dia)
+                      for dia in range(DIAS_HISTORIA + 1) for c in range(categorias)]
+    # Cantidades distintas para que los más vendidos no empiecen empatados:
+    # ordenar empates es más barato y la primera fila saldría optimista
+    _insertar(pagos, (_orden("bench_base", [_item(j, 1 + j * 7 % 97)], ahora - timedelta(days=dia))
+                      for j, dia in combinaciones))
+    return len(combinaciones)
+
+def tablero_desde_pagos(pagos, dias=30, top=10):
+    # Lo que costaría el tablero sin resúmenes: agregaciones sobre pagos
+    desde = datetime.now() - timedelta(days=dias - 1)
+    en_periodo = {"estado": {"$ne": "pendiente"}, "fecha_compra": {"$gte": desde}}
+    return (
+        list(pagos.aggregate([
+            {"$match": en_periodo},
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$fecha_compra"}},
+                        "ordenes": {"$sum": 1}, "ingresos": {"$sum": "$total"}}},
+        ], allowDiskUse=True)),
+        list(pagos.aggregate([
+            {"$match": en_periodo},
+            {"$unwind": "$carrito"},
+            {"$group": {"_id": "$carrito.category",
+                        "ingresos": {"$sum": {"$multiply": ["$carrito.price", "$carrito.cantidad"]}}}},
+        ], allowDiskUse=True)),
+        list(pagos.aggregate([
+            {"$match": {"estado": {"$ne": "pendiente"}}},
+            {"$unwind": "$carrito"},
+            {"$group": {"_id": "$carrito._id", "unidades": {"$sum": "$carrito.cantidad"}}},
+            {"$sort": {"unidades": -1}},
+            {"$limit": top},
+        ], allowDiskUse=True)),
+    )
+
+def latencia_ms(funcion, repeticiones):
+    # Como timeit: el mínimo de las repeticiones y sin el recolector de
+    # basura. Con mongomock todo pagos vive en este proceso y una pasada del
+    # GC cuesta según su tamaño, no según lo que hace el tablero.
+    funcion()
+    gc.collect()
+    gc.disable()
+    try:
+        return min(cronometrar(funcion)[0] * 1000 for _ in range(repeticiones))
+    finally:
+        gc.enable()
+
+def documentos_leidos(datos):
+    return len(datos["por_dia"]) + len(datos["por_categoria_dia"]) + len(datos["mas_vendidos"])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--productos", type=int, default=PRODUCTOS)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--directo-hasta", type=int, default=1000000,
+                        help="no medir la agregación directa sobre pagos por encima de este tamaño")
+    args = parser.parse_args()
+
+    db = conectar()
+    crear_indices(db)
+    db["pagos"].delete_many({})
+    for nombre in COLECCIONES:
+        db[nombre].delete_many({})
+    db["meta"].delete_one({"_id": "analitica"})
+
+    print(f"{'órdenes':>10} {'nuevas':>9} {'pasada s':>9} {'órdenes/s':>10} "
+          f"{'docs':>6} {'tablero ms':>11} {'directo ms':>11}")
+    total = sembrar_resumen_lleno(db["pagos"], args.productos)
+    tamanos = [total] + [tamano for tamano in sorted(args.tamanos) if tamano > total]
+    for tamano in tamanos:
+        sembrar_ordenes_mixtas(db["pagos"], tamano - total, semilla=tamano, productos=args.productos)
+        total = tamano
+        time.sleep(1.1)  # el _id tiene resolución de segundos; margen=0 toma todo lo sembrado
+        segundos, procesadas = cronometrar(lambda: actualizar_analitica(db, margen=0))
+
+        rapido = latencia_ms(lambda: tablero(db), args.repeticiones)
+        directo = (f"{latencia_ms(lambda: tablero_desde_pagos(db['pagos']), 3):>11.1f}"
+                   if tamano <= args.directo_hasta else f"{'-':>11}")
+        print(f"{tamano:>10,} {procesadas:>9,} {segundos:>9.1f} {procesadas / segundos:>10,.0f} "
+              f"{documentos_leidos(tablero(db)):>6} {rapido:>11.2f} {directo}")
+
+if __name__ == "__main__":
+    main()
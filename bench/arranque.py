@@ -0,0 +1,50 @@
+# Tiempo de arranque de un worker: importar `app` y crear la aplicación (lo
+# que hace gunicorn en cada worker sin preload, cada `flask` del CLI y cada
+# prueba) y atender la primera petición que no usa la base. Cada medición
+# corre en un intérprete nuevo. --ruta permite medir otra copia del repo (p. ej. un `git worktree`
+# del commit anterior) para comparar antes/después.
+#
+#   python -m bench.arranque --uri mongodb://10.255.255.1:27017/six
+#   git worktree add /tmp/six-antes HEAD~1 && python -m bench.arranque --ruta /tmp/six-antes
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_MEDIR = """
+import json, time
+inicio = time.perf_counter()
+import app as modulo
+aplicacion = modulo.create_app() if hasattr(modulo, "create_app") else modulo.app
+importado = time.perf_counter()
+aplicacion.test_client().get("/")
+print(json.dumps({"importar": importado - inicio, "primera": time.perf_counter() - importado}))
+"""
+
+def medir(ruta, entorno):
+    salida = subprocess.run([sys.executable, "-c", _MEDIR], cwd=ruta, env=entorno,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ruta", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--uri", default="mongodb://10.255.255.1:27017/six",
+                        help="MONGO_URI del worker; por defecto una IP que no responde, como una red lenta")
+    args = parser.parse_args()
+
+    entorno = dict(os.environ, MONGO_URI=args.uri, PYTHONDONTWRITEBYTECODE="1")
+    entorno.setdefault("SECRET_KEY", "six-bench")
+    medir(args.ruta, entorno)  # calienta la caché de disco del sistema
+    mediciones = [medir(args.ruta, entorno) for _ in range(args.repeticiones)]
+    print(f"{args.ruta}  (MONGO_URI={args.uri})")
+    for campo, titulo in (("importar", "import app"), ("primera", "primera petición")):
+        valores = [m[campo] * 1000 for m in mediciones]
+        print(f"{titulo:>18}: mediana {statistics.median(valores):>8.1f} ms  "
+              f"(min {min(valores):.1f}, max {max(valores):.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# Bytes y tiempo que cuesta /inicio con sus CSS/JS propios: visita en frío
+# (sin caché) contra visita en caliente. La visita se hace de verdad con
+# app.test_client() y una caché de navegador mínima: los assets con
+# Cache-Control vigente no se piden, el HTML se revalida con su ETag.
+#
+#   python -m bench.assets                                   (mongod local)
+#   SIX_BENCH_MONGO_URI=mongomock:// python -m bench.assets  (en memoria)
+import os
+import re
+import time
+
+from assets import BASE, DIR_DIST, FUENTES, construir
+from bench._comun import MONGO_URI, sembrar_productos, sembrar_usuarios
+
+_ASSET = re.compile(r"asset\('([^']+)'\)")
+_URL_ASSET = re.compile(r'(?:href|src)="(/assets/[^"]+)"')
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+CONTRASENA = "secreto123"
+
+def origen(nombre):
+    for prefijo, carpeta in FUENTES.items():
+        if prefijo and nombre.startswith(prefijo):
+            return os.path.join(carpeta, nombre[len(prefijo):])
+    return os.path.join(FUENTES[""], nombre)
+
+# ------------------ TAMAÑOS EN DISCO ------------------
+def tamanos(manifest):
+    with open(os.path.join(BASE, "templates", "inicio.html"), encoding="utf-8") as entrada:
+        nombres = _ASSET.findall(entrada.read())
+
+    print(f"{'asset':>28} {'original':>10} {'minificado':>11} {'gzip':>8} {'brotli':>8}")
+    totales = [0, 0, 0, 0]
+    for nombre in nombres:
+        publicado = os.path.join(DIR_DIST, manifest[nombre])
+        with open(origen(nombre), "rb") as entrada:
+            original = len(entrada.read())
+        fila = [
+            original,
+            os.path.getsize(publicado),
+            os.path.getsize(publicado + ".gz"),
+            os.path.getsize(publicado + ".br") if os.path.exists(publicado + ".br") else 0,
+        ]
+        totales = [t + n for t, n in zip(totales, fila)]
+        print(f"{nombre:>28} {fila[0]:>10} {fila[1]:>11} {fila[2]:>8} {fila[3]:>8}")
+    print(f"{'total':>28} {totales[0]:>10} {totales[1]:>11} {totales[2]:>8} {totales[3]:>8}")
+
+# ------------------ VISITA CON CACHÉ DE NAVEGADOR ------------------
+class Navegador:
+    # Guarda por URL lo que guardaría un navegador: validadores y hasta
+    # cuándo la respuesta es fresca según Cache-Control
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.cache = {}
+
+    def pedir(self, url):
+        guardado = self.cache.get(url)
+        if guardado and guardado["fresco_hasta"] > time.time():
+            return "caché", 0, 0.0
+
+        cabeceras = {"Accept-Encoding": "br, gzip"}
+        if guardado and guardado["etag"]:
+            cabeceras["If-None-Match"] = guardado["etag"]
+        if guardado and guardado["modificado"]:
+            cabeceras["If-Modified-Since"] = guardado["modificado"]
+
+        inicio = time.perf_counter()
+        respuesta = self.cliente.get(url, headers=cabeceras)
+        cuerpo = respuesta.get_data()
+        ms = (time.perf_counter() - inicio) * 1000
+        if respuesta.status_code not in (200, 304):
+            raise RuntimeError(f"{url} respondió {respuesta.status_code}")
+
+        control = respuesta.headers.get("Cache-Control", "")
+        max_age = _MAX_AGE.search(control)
+        self.cache[url] = {
+            "etag": respuesta.headers.get("ETag") or (guardado or {}).get("etag"),
+            "modificado": respuesta.headers.get("Last-Modified") or (guardado or {}).get("modificado"),
+            "fresco_hasta": time.time() + int(max_age.group(1)) if max_age and "no-cache" not in control else 0,
+            "cuerpo": cuerpo if respuesta.status_code == 200 else guardado["cuerpo"],
+        }
+        return respuesta.status_code, len(cuerpo), ms
+
+    def visitar(self, pagina):
+        estado, bytes_html, ms = self.pedir(pagina)
+        filas = [(pagina, estado, bytes_html, ms)]
+        for url in _URL_ASSET.findall(self.cache[pagina]["cuerpo"].decode("utf-8")):
+            filas.append((url,) + self.pedir(url))
+        return filas
+
+def preparar_app():
+    # Igual que bench.carga --en-proceso: con mongomock:// la app y el
+    # benchmark comparten el mismo cliente en memoria
+    import conexion
+    if MONGO_URI.startswith("mongomock://"):
+        import mongomock
+        cliente = mongomock.MongoClient()
+        conexion.MongoClient = lambda *args, **kwargs: cliente
+
+    from app import create_app
+    from catalogo import marcar_cambio
+    app = create_app({"MONGO_URI": MONGO_URI, "MONGO_DB": "six_bench", "SECRET_KEY": "six-bench"})
+    with app.app_context():
+        db = conexion.obtener_db()
+        sembrar_productos(db["productos"], 60)
+        marcar_cambio(db["productos"])
+        usuario = sembrar_usuarios(db["usuarios"], 1, CONTRASENA)[0]
+
+    cliente = app.test_client()
+    respuesta = cliente.post("/", data={"usuario": usuario, "contrasena": CONTRASENA})
+    if respuesta.status_code != 302:
+        raise RuntimeError(f"login falló ({respuesta.status_code})")
+    return cliente
+
+def imprimir(nombre, filas):
+    print(f"\n{nombre}")
+    print(f"{'recurso':>44} {'estado':>7} {'bytes':>8} {'ms':>8}")
+    for url, estado, cantidad, ms in filas:
+        print(f"{url[-44:]:>44} {estado:>7} {cantidad:>8} {ms:>8.2f}")
+    pedidas = sum(1 for fila in filas if fila[1] != "caché")
+    print(f"{'total (' + str(pedidas) + ' peticiones)':>44} {'':>7} "
+          f"{sum(f[2] for f in filas):>8} {sum(f[3] for f in filas):>8.2f}")
+
+def main():
+    tamanos(construir())
+    navegador = Navegador(preparar_app())
+    imprimir("frío", navegador.visitar("/inicio"))
+    imprimir("caliente", navegador.visitar("/inicio"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Compara el buscador anterior ($regex sin anclar dentro de un $or) contra
+# el índice invertido de busqueda.py: consultas/seg y latencia p99.
+#
+#   python -m bench.busqueda 100000
+import random
+import re
+import sys
+import time
+
+from bench._comun import CATEGORIAS, MARCAS, conectar, percentil, sembrar_productos
+from busqueda import IndiceBusqueda
+from catalogo import PROYECCION_TARJETA
+
+def buscar_regex(productos, q):
+    q = re.escape(q)
+    return list(productos.find({
+        "$or": [
+            {"name": {"$regex": q, "$options": "i"}},
+            {"brand": {"$regex": q, "$options": "i"}},
+            {"category": {"$regex": q, "$options": "i"}}
+        ]
+    }))
+
+def buscar_indice(indice, productos, q):
+    ids = indice.buscar(productos, q)
+    return list(productos.find({"_id": {"$in": ids}}, PROYECCION_TARJETA))
+
+def consultas(n, semilla=7):
+    rnd = random.Random(semilla)
+    palabras = [c for c in CATEGORIAS] + [m.lower() for m in MARCAS] + ["producto"]
+    # Mezcla de palabras completas y prefijos, como al teclear
+    return [rnd.choice(palabras)[:rnd.randint(3, 8)] for _ in range(n)]
+
+def medir(nombre, funcion, qs):
+    latencias = []
+    inicio = time.perf_counter()
+    for q in qs:
+        t = time.perf_counter()
+        funcion(q)
+        latencias.append(time.perf_counter() - t)
+    total = time.perf_counter() - inicio
+    print(f"{nombre:>8}: {len(qs) / total:>10.1f} consultas/s  "
+          f"p50 {percentil(latencias, 50) * 1000:.2f} ms  p99 {percentil(latencias, 99) * 1000:.2f} ms")
+
+def main(n, repeticiones=200):
+    productos = conectar()["productos"]
+    sembrar_productos(productos, n)
+    qs = consultas(repeticiones)
+
+    indice = IndiceBusqueda()
+    t = time.perf_counter()
+    indice.buscar(productos, "x")
+    print(f"{n} productos, índice construido en {time.perf_counter() - t:.2f} s")
+
+    medir("regex", lambda q: buscar_regex(productos, q), qs)
+    medir("indice", lambda q: buscar_indice(indice, productos, q), qs)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
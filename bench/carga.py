@@ -0,0 +1,334 @@
+# Prueba de carga del recorrido completo de la tienda con usuarios virtuales
+# concurrentes: login -> inicio -> buscar -> producto -> agregar al carrito
+# -> pago -> historial. Reporta req/s, p50/p95/p99 y consultas a Mongo por
+# petición (del header Server-Timing) y guarda todo en JSON para comparar
+# entre commits.
+#
+# Con la app en este mismo proceso (mongomock o un mongod local):
+#
+#   SIX_BENCH_MONGO_URI=mongomock:// python -m bench.carga --en-proceso \
+#       --sembrar 5000 --usuarios-sembrados 200 --ordenes-por-usuario 50 \
+#       --usuarios 20 --iteraciones 25
+#
+# Contra un servidor ya levantado (para comparar los modos de gunicorn):
+#
+#   export MONGO_URI=mongodb://localhost:27017/six_bench MONGO_DB=six_bench
+#   SIX_BENCH_MONGO_URI=$MONGO_URI python -m bench.carga --sembrar 5000 --usuarios-sembrados 200 --solo-sembrar
+#   SIX_MODO_SERVIDOR=gthread SECRET_KEY=... gunicorn -c gunicorn.conf.py "app:create_app()" &
+#   python -m bench.carga http://127.0.0.1:8000 --usuarios-sembrados 200 --usuarios 50 --segundos 30
+#
+#   python -m bench.carga ... --comparar bench/resultados/carga-<commit>.json
+from datetime import datetime
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import re
+import subprocess
+import threading
+import time
+import uuid
+
+from bench._comun import (CATEGORIAS, MARCAS, MONGO_URI, conectar, percentil,
+                          sembrar_ordenes, sembrar_productos, sembrar_usuarios)
+
+_ENLACE_PRODUCTO = re.compile(r"/producto/([0-9a-f]{24})")
+_CLAVE_PAGO = re.compile(r'name="clave_pago" value="([0-9a-f]+)"')
+# pago_exitoso.html muestra "#<numero_orden>"; el mismo número debe salir en /historial
+_NUMERO_ORDEN = re.compile(rb"#(SIX-\d{12})\b")
+_SERVER_TIMING = re.compile(r'mongo;dur=([\d.]+);desc="(\d+) consultas"')
+CONTRASENA = "secreto123"
+RUTAS = ["login", "inicio", "buscar", "producto", "agregar_carrito", "pago (form)", "pago", "historial"]
+
+class _SinRedirecciones(HTTPRedirectHandler):
+    # Cada petición se mide sola: un 302 no arrastra el GET siguiente
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class FalloFlujo(Exception):
+    pass
+
+class UsuarioVirtual:
+    def __init__(self, base, usuario=None):
+        self.base = base.rstrip("/")
+        self.navegador = build_opener(HTTPCookieProcessor(CookieJar()), _SinRedirecciones())
+        self.usuario = usuario
+        self.registrar = usuario is None
+        if self.registrar:
+            self.usuario = f"vu_{uuid.uuid4().hex[:12]}"
+
+    def pedir(self, ruta, datos=None):
+        cuerpo = urlencode(datos).encode() if datos is not None else None
+        inicio = time.perf_counter()
+        try:
+            respuesta = self.navegador.open(self.base + ruta, data=cuerpo, timeout=30)
+        except HTTPError as e:
+            if not 300 <= e.code < 400:
+                raise
+            respuesta = e
+        with respuesta:
+            contenido = respuesta.read()
+        segundos = time.perf_counter() - inicio
+        medicion = _SERVER_TIMING.search(respuesta.headers.get("Server-Timing", ""))
+        mongo = (float(medicion.group(1)), int(medicion.group(2))) if medicion else (0.0, 0)
+        return respuesta.status, respuesta.headers, contenido, segundos, mongo
+
+    def registrarse(self):
+        if self.registrar:
+            self.pedir("/registro", {
+                "usuario": self.usuario,
+                "contrasena": CONTRASENA,
+                "confirmar": CONTRASENA,
+                "fecha_nacimiento": "1990-01-01",
+                "verificacion_edad": "on",
+                "terminos": "on",
+            })
+            self.registrar = False
+
+    def entrar(self):
+        self.registrarse()
+        return self.pedir("/", {"usuario": self.usuario, "contrasena": CONTRASENA})
+
+class Resultados:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = {}
+        self.mongo = {}
+        self.errores = {}
+
+    def registrar(self, ruta, segundos, mongo):
+        with self._lock:
+            self.latencias.setdefault(ruta, []).append(segundos)
+            self.mongo.setdefault(ruta, []).append(mongo)
+
+    def error(self, ruta):
+        with self._lock:
+            self.errores[ruta] = self.errores.get(ruta, 0) + 1
+
+def _paso(usuario, resultados, nombre, ruta, datos=None, validar=None):
+    try:
+        estado, cabeceras, contenido, segundos, mongo = usuario.pedir(ruta, datos)
+        if validar and not validar(estado, cabeceras, contenido):
+            raise FalloFlujo(f"{nombre}: respuesta inesperada ({estado})")
+    except Exception:
+        resultados.error(nombre)
+        return None
+    resultados.registrar(nombre, segundos, mongo)
+    return contenido
+
+def recorrer(usuario, ids, resultados, semilla, iteraciones, hasta):
+    rnd = random.Random(semilla)
+    palabras = CATEGORIAS + [m.lower() for m in MARCAS]
+    usuario.registrarse()
+    if _paso(usuario, resultados, "login", "/", {"usuario": usuario.usuario, "contrasena": CONTRASENA},
+             validar=lambda e, c, _: e == 302 and c.get("Location", "").endswith("/inicio")) is None:
+        return
+
+    hechas = 0
+    while (iteraciones and hechas < iteraciones) or (not iteraciones and time.monotonic() < hasta):
+        hechas += 1
+        producto_id = rnd.choice(ids)
+        _paso(usuario, resultados, "inicio", "/inicio", validar=lambda e, c, _: e == 200)
+        _paso(usuario, resultados, "buscar", f"/buscar?q={rnd.choice(palabras)}", validar=lambda e, c, _: e == 200)
+        _paso(usuario, resultados, "producto", f"/producto/{producto_id}", validar=lambda e, c, _: e == 200)
+        _paso(usuario, resultados, "agregar_carrito", f"/agregar_carrito/{producto_id}", {},
+              validar=lambda e, c, _: e == 302 and c.get("Location", "").endswith("/carrito"))
+        formulario = _paso(usuario, resultados, "pago (form)", "/pago", validar=lambda e, c, _: e == 200)
+        clave = _CLAVE_PAGO.search(formulario.decode()) if formulario else None
+        numero = None
+        if clave:
+            exito = _paso(usuario, resultados, "pago", "/pago", {
+                "nombre": "Bench", "tarjeta": "4111111111111111", "cvv": "123",
+                "fecha": "12/30", "clave_pago": clave.group(1),
+            }, validar=lambda e, c, contenido: e == 200 and _NUMERO_ORDEN.search(contenido) is not None)
+            numero = _NUMERO_ORDEN.search(exito).group(1) if exito else None
+        # La orden recién pagada es la primera del historial: el número que
+        # vio el cliente tiene que ser el guardado
+        _paso(usuario, resultados, "historial", "/historial",
+              validar=lambda e, c, contenido: e == 200 and (numero is None or numero in contenido))
+
+def descubrir_productos(base, usuario=None):
+    # Los ids se sacan de la primera página del catálogo
+    explorador = UsuarioVirtual(base, usuario)
+    explorador.entrar()
+    contenido = explorador.pedir("/inicio")[2]
+    return sorted(set(_ENLACE_PRODUCTO.findall(contenido.decode())))
+
+# ------------------ APP EN PROCESO ------------------
+def levantar_en_proceso():
+    # La app corre en un hilo de este proceso sobre la base de
+    # SIX_BENCH_MONGO_URI (nunca la de producción). Con mongomock:// es la
+    # única forma de que app y benchmark vean los mismos datos.
+    import conexion
+    if MONGO_URI.startswith("mongomock://"):
+        import mongomock
+        cliente = mongomock.MongoClient()
+        conexion.MongoClient = lambda *args, **kwargs: cliente
+
+    from werkzeug.serving import make_server
+    from app import create_app
+    app = create_app({"MONGO_URI": MONGO_URI, "MONGO_DB": "six_bench", "SECRET_KEY": "six-bench"})
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    servidor = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    with app.app_context():
+        return f"http://127.0.0.1:{servidor.server_port}", conexion.obtener_db()
+
+def sembrar(db, args):
+    from catalogo import marcar_cambio
+    nombres = []
+    if args.sembrar:
+        sembrar_productos(db["productos"], args.sembrar)
+        marcar_cambio(db["productos"])
+    if args.usuarios_sembrados:
+        nombres = sembrar_usuarios(db["usuarios"], args.usuarios_sembrados, CONTRASENA)
+        for nombre in nombres if args.ordenes_por_usuario else ():
+            sembrar_ordenes(db["pagos"], nombre, args.ordenes_por_usuario)
+        db["resumenes"].delete_many({"_id": {"$in": nombres}})
+    return nombres
+
+# ------------------ RESULTADOS ------------------
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+def resumir(resultados, segundos, args):
+    # mongomock no emite eventos de comandos: el monitor de metricas.py no
+    # ve nada y Server-Timing diría 0 consultas. Se guarda null, no un 0
+    # que parezca una medición.
+    medir_mongo = not MONGO_URI.startswith("mongomock://")
+    rutas = {}
+    for ruta in RUTAS:
+        latencias = resultados.latencias.get(ruta, [])
+        mongo = resultados.mongo.get(ruta, [])
+        n = len(latencias)
+        rutas[ruta] = {
+            "peticiones": n,
+            "errores": resultados.errores.get(ruta, 0),
+            "req_s": n / segundos,
+            "media_ms": sum(latencias) / n * 1000 if n else 0.0,
+            "p50_ms": percentil(latencias, 50) * 1000,
+            "p95_ms": percentil(latencias, 95) * 1000,
+            "p99_ms": percentil(latencias, 99) * 1000,
+            "consultas_mongo": (sum(c for _, c in mongo) / n if n else 0.0) if medir_mongo else None,
+            "mongo_ms": (sum(d for d, _ in mongo) / n if n else 0.0) if medir_mongo else None,
+        }
+    todas = [s for latencias in resultados.latencias.values() for s in latencias]
+    return {
+        "commit": _commit(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "parametros": vars(args),
+        "entorno": {
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "mongo": "mongomock" if MONGO_URI.startswith("mongomock://") else "mongod",
+            "modo_servidor": os.environ.get("SIX_MODO_SERVIDOR", ""),
+        },
+        "segundos": segundos,
+        "rutas": rutas,
+        "total": {
+            "peticiones": len(todas),
+            "errores": sum(resultados.errores.values()),
+            "req_s": len(todas) / segundos,
+            "p50_ms": percentil(todas, 50) * 1000,
+            "p95_ms": percentil(todas, 95) * 1000,
+            "p99_ms": percentil(todas, 99) * 1000,
+        },
+    }
+
+def _columna(valor, ancho):
+    return f"{'n/a':>{ancho}}" if valor is None else f"{valor:>{ancho}.1f}"
+
+def imprimir(resumen, anterior=None):
+    print(f"{'ruta':>16} {'peticiones':>10} {'errores':>8} {'req/s':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'consultas':>10} {'mongo ms':>9}")
+    filas = list(resumen["rutas"].items()) + [("total", resumen["total"])]
+    for ruta, datos in filas:
+        print(f"{ruta:>16} {datos['peticiones']:>10} {datos['errores']:>8} {datos['req_s']:>8.1f} "
+              f"{datos['p50_ms']:>8.1f} {datos['p95_ms']:>8.1f} {datos['p99_ms']:>8.1f} "
+              f"{_columna(datos.get('consultas_mongo'), 10)} {_columna(datos.get('mongo_ms'), 9)}")
+    if anterior:
+        print(f"\nContra {anterior['commit']} ({anterior['fecha']}):")
+        print(f"{'ruta':>16} {'req/s':>10} {'p95 ms':>10} {'p99 ms':>10}")
+        for ruta, datos in filas:
+            previo = anterior["total"] if ruta == "total" else anterior["rutas"].get(ruta)
+            if not previo or not previo["peticiones"]:
+                continue
+            cambios = [
+                (datos[campo] - previo[campo]) / previo[campo] if previo[campo] else 0.0
+                for campo in ("req_s", "p95_ms", "p99_ms")
+            ]
+            print(f"{ruta:>16} " + " ".join(f"{c:>+10.1%}" for c in cambios))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base", nargs="?", default="http://127.0.0.1:8000")
+    parser.add_argument("--en-proceso", action="store_true",
+                        help="levanta la app en este proceso sobre SIX_BENCH_MONGO_URI")
+    parser.add_argument("--usuarios", type=int, default=20, help="usuarios virtuales concurrentes")
+    parser.add_argument("--segundos", type=float, default=20)
+    parser.add_argument("--iteraciones", type=int, default=0,
+                        help="recorridos por usuario virtual (en lugar de --segundos)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--sembrar", type=int, default=0, help="productos a sembrar")
+    parser.add_argument("--usuarios-sembrados", type=int, default=0,
+                        help="usuarios bench_NNNNNN con contraseña conocida; sin esto cada usuario virtual se registra")
+    parser.add_argument("--ordenes-por-usuario", type=int, default=0)
+    parser.add_argument("--solo-sembrar", action="store_true")
+    parser.add_argument("--json", default=None, help="por defecto bench/resultados/carga-<commit>.json")
+    parser.add_argument("--comparar", default=None, help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    if args.en_proceso:
+        base, db = levantar_en_proceso()
+    else:
+        base, db = args.base, conectar()
+    nombres = sembrar(db, args)
+    if args.usuarios_sembrados and not nombres:
+        nombres = [f"bench_{i:06d}" for i in range(args.usuarios_sembrados)]
+    if args.solo_sembrar:
+        return
+
+    ids = descubrir_productos(base, nombres[0] if nombres else None)
+    if not ids:
+        raise SystemExit("No se encontraron productos en /inicio")
+
+    resultados = Resultados()
+    hasta = time.monotonic() + args.segundos
+    hilos = [
+        threading.Thread(target=recorrer, args=(
+            UsuarioVirtual(base, nombres[i % len(nombres)] if nombres else None),
+            ids, resultados, args.semilla + i, args.iteraciones, hasta))
+        for i in range(args.usuarios)
+    ]
+    inicio = time.monotonic()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    resumen = resumir(resultados, time.monotonic() - inicio, args)
+    anterior = None
+    if args.comparar:
+        with open(args.comparar) as entrada:
+            anterior = json.load(entrada)
+    imprimir(resumen, anterior)
+
+    ruta = args.json or os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados",
+                                     f"carga-{resumen['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, "w") as salida:
+        json.dump(resumen, salida, indent=2, ensure_ascii=False)
+    print(f"\nResultados en {ruta}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Muchas compras en paralelo del mismo producto con stock limitado, más
+# reenvíos con la misma clave. Verifica que no se venda de más y que no se
+# dupliquen órdenes, y reporta compras/seg.
+#
+#   python -m bench.checkout --stock 500 --compradores 64 --intentos 20
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import argparse
+import time
+import uuid
+
+from bench._comun import conectar
+from checkout import StockInsuficiente, procesar_pago
+
+def comprar(productos, pagos, producto, comprador, intentos):
+    vendidos = rechazados = repetidos = 0
+    for intento in range(intentos):
+        clave = uuid.uuid4().hex
+        pago_data = {
+            "usuario": f"comprador_{comprador}",
+            "carrito": [{"_id": str(producto["_id"]), "name": producto["name"], "price": 10.0, "cantidad": 1}],
+            "total": 10.0,
+            "fecha_compra": datetime.now(),
+            "numero_orden": f"BENCH-{comprador}-{intento}",
+        }
+        # Cada compra se envía dos veces, como un doble clic
+        for _ in range(2):
+            try:
+                _, nueva = procesar_pago(pagos, productos, clave, pago_data)
+                if nueva:
+                    vendidos += 1
+                else:
+                    repetidos += 1
+            except StockInsuficiente:
+                rechazados += 1
+    return vendidos, rechazados, repetidos
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--compradores", type=int, default=64)
+    parser.add_argument("--intentos", type=int, default=20)
+    args = parser.parse_args()
+
+    db = conectar()
+    productos, pagos = db["productos_checkout"], db["pagos_checkout"]
+    productos.drop()
+    pagos.drop()
+    productos.insert_one({"name": "Producto limitado", "price": 10, "stock": args.stock})
+    producto = productos.find_one()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.compradores) as pool:
+        resultados = list(pool.map(
+            lambda c: comprar(productos, pagos, producto, c, args.intentos),
+            range(args.compradores)
+        ))
+    segundos = time.perf_counter() - inicio
+
+    vendidos = sum(r[0] for r in resultados)
+    rechazados = sum(r[1] for r in resultados)
+    repetidos = sum(r[2] for r in resultados)
+    stock_final = productos.find_one({"_id": producto["_id"]})["stock"]
+    ordenes = pagos.count_documents({"estado": "confirmada"})
+    intentos = args.compradores * args.intentos * 2
+
+    print(f"{intentos} envíos en {segundos:.2f} s ({intentos / segundos:.0f}/s)")
+    print(f"vendidos {vendidos}, sin stock {rechazados}, reenvíos absorbidos {repetidos}")
+    print(f"órdenes confirmadas {ordenes}, stock final {stock_final}")
+    ok = (stock_final >= 0 and vendidos == ordenes == args.stock - stock_final
+          and vendidos <= args.stock)
+    print("OK: sin sobreventa ni órdenes duplicadas" if ok else "FALLA")
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Logins por segundo por núcleo según el costo de scrypt, y cuánto escala
+# el pool de hashes con varios hilos. No necesita MongoDB.
+#
+#   python -m bench.credenciales
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from credenciales import hashear, verificar
+
+def medir(n, hilos, segundos=2.0):
+    almacenada = hashear("secreto123", n=n)
+    hasta = time.perf_counter() + segundos
+
+    def trabajar():
+        hechos = 0
+        while time.perf_counter() < hasta:
+            verificar(almacenada, "secreto123")
+            hechos += 1
+        return hechos
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        total = sum(pool.map(lambda _: trabajar(), range(hilos)))
+    return total / (time.perf_counter() - inicio)
+
+def main():
+    print(f"{'N':>8} {'ms/login':>9} {'logins/s 1 hilo':>16} {'logins/s 2 hilos':>17}")
+    for exponente in (12, 13, 14, 15, 16):
+        n = 2 ** exponente
+        uno = medir(n, 1)
+        dos = medir(n, 2)
+        print(f"{n:>8} {1000 / uno:>9.1f} {uno:>16.1f} {dos:>17.1f}")
+
+if __name__ == "__main__":
+    main()
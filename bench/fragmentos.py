@@ -0,0 +1,62 @@
+# CPU de render por petición de /inicio: la plantilla completa en cada
+# visita (antes), la grilla desde la caché de fragmentos (después) y la
+# visita repetida que responde 304. Solo mide Jinja; la página de productos
+# se arma en memoria, sin consultar Mongo.
+#
+#   python -m bench.fragmentos [peticiones]
+import sys
+import time
+
+from bson import ObjectId
+
+from app import create_app
+from bench._comun import productos_sinteticos
+from catalogo import PRODUCTOS_POR_PAGINA
+from fragmentos import fragmento, respuesta_condicional
+from flask import render_template
+
+# Sin índices ni base: aquí solo se renderiza
+app = create_app({"CREAR_INDICES": False, "TESTING": True})
+
+def medir(n, funcion, **contexto):
+    with app.test_request_context("/inicio", **contexto):
+        funcion()  # compila la plantilla fuera de la medición
+        inicio = time.process_time()
+        for _ in range(n):
+            funcion()
+        return (time.process_time() - inicio) / n * 1e6
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pagina = [dict(p, _id=ObjectId()) for p in productos_sinteticos(PRODUCTOS_POR_PAGINA)]
+    contexto = {"usuario": "bench", "mayor_edad": True}
+
+    def completa():
+        return render_template("inicio.html", productos=pagina, siguiente=str(pagina[-1]["_id"]), anterior=None, **contexto)
+
+    def grilla():
+        return render_template("_grilla_productos.html", productos=pagina, siguiente=str(pagina[-1]["_id"]), anterior=None, mayor_edad=True)
+
+    def con_fragmento():
+        return render_template("inicio.html", grilla=fragmento(("bench",), grilla), **contexto)
+
+    partes = ("bench", 1, "/inicio?", "bench", True)
+    with app.test_request_context("/inicio"):
+        etag = respuesta_condicional(partes, None, con_fragmento).get_etag()[0]
+
+    def condicional():
+        return respuesta_condicional(partes, None, con_fragmento)
+
+    app.extensions["six"]["fragmentos"].limpiar()
+    resultados = [
+        ("plantilla completa", medir(n, completa)),
+        ("grilla en caché", medir(n, con_fragmento)),
+        ("304 (If-None-Match)", medir(n, condicional, headers={"If-None-Match": f'W/"{etag}"'})),
+    ]
+    base = resultados[0][1]
+    print(f"{'caso':>22} {'µs CPU/petición':>16}")
+    for caso, micros in resultados:
+        print(f"{caso:>22} {micros:>16.1f}  ({micros / base:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# Historial de un usuario con muchas órdenes: lista completa con el carrito
+# embebido (como antes) contra la primera página proyectada + el resumen.
+#
+#   python -m bench.historial 10000
+import sys
+import tracemalloc
+
+from bench._comun import conectar, cronometrar, sembrar_ordenes
+from historial import obtener_resumen, pagina_historial
+
+def medir(nombre, funcion):
+    tracemalloc.start()
+    segundos, _ = cronometrar(funcion, repeticiones=3)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:>22}: {segundos * 1000:>9.1f} ms  pico {pico / 1024:>9.0f} KB")
+
+def main(n):
+    db = conectar()
+    pagos, resumenes = db["pagos"], db["resumenes"]
+    pagos.create_index([("usuario", 1), ("fecha_compra", -1)])
+    usuario = "comprador_frecuente"
+    sembrar_ordenes(pagos, usuario, n)
+    resumenes.delete_one({"_id": usuario})
+    obtener_resumen(resumenes, pagos, usuario)
+    print(f"{n} órdenes")
+
+    medir("lista completa", lambda: list(pagos.find({"usuario": usuario}).sort("fecha_compra", -1)))
+    medir("página + resumen", lambda: (pagina_historial(pagos, usuario),
+                                       obtener_resumen(resumenes, pagos, usuario)))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
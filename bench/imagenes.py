@@ -0,0 +1,62 @@
+# Miniaturas: bytes que baja una tarjeta de inicio.html con la imagen
+# original contra la WebP de 320px, y tiempo del backfill en serie contra el
+# pool de procesos. Las imágenes se generan en un directorio temporal.
+#
+#   python -m bench.imagenes [imagenes] [procesos]
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import sys
+import tempfile
+
+from PIL import Image, ImageDraw
+
+import imagenes
+from bench._comun import cronometrar
+
+def imagen_sintetica(ruta, semilla, lado=1200):
+    rnd = random.Random(semilla)
+    imagen = Image.new("RGB", (lado, lado), (255, 255, 255))
+    dibujo = ImageDraw.Draw(imagen)
+    for _ in range(60):
+        x, y = rnd.randint(0, lado), rnd.randint(0, lado)
+        r = rnd.randint(20, 200)
+        color = tuple(rnd.randint(0, 255) for _ in range(3))
+        dibujo.ellipse((x - r, y - r, x + r, y + r), fill=color)
+    imagen.save(ruta, "JPEG", quality=90)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        originales = []
+        for i in range(n):
+            ruta = os.path.join(tmp, f"original-{i}.jpg")
+            imagen_sintetica(ruta, i)
+            originales.append(ruta)
+
+        resultados = {}
+        for modo, pool in (("serie", None), (f"pool x{procesos}", procesos)):
+            # Carpeta vacía por corrida para que no reutilice lo ya generado
+            imagenes.DIR_MINIATURAS = os.path.join(tmp, modo.replace(" ", ""))
+            if pool is None:
+                segundos, generadas = cronometrar(lambda: [imagenes.generar_miniaturas(o) for o in originales])
+            else:
+                with ProcessPoolExecutor(max_workers=pool) as ejecutor:
+                    segundos, generadas = cronometrar(lambda: list(ejecutor.map(imagenes.generar_miniaturas, originales)))
+            resultados[modo] = generadas
+            print(f"{modo:>12}: {segundos:.2f}s  ({n / segundos:.1f} imágenes/s)")
+
+        original = sum(os.path.getsize(o) for o in originales) / n
+        print(f"\n{'bytes por tarjeta':>20}")
+        print(f"{'original':>20} {original:>10.0f}")
+        for ancho in imagenes.ANCHOS:
+            tamano = sum(
+                os.path.getsize(os.path.join(imagenes.DIR_MINIATURAS, m[str(ancho)]))
+                for m in resultados[modo]
+            ) / n
+            print(f"{f'webp {ancho}px':>20} {tamano:>10.0f}  ({tamano / original:.0%})")
+
+if __name__ == "__main__":
+    main()
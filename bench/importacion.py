@@ -0,0 +1,33 @@
+# Carga de catálogo: filas/s y memoria máxima al importar un archivo
+# sintético con upserts de uno en uno contra lotes de bulk_write. Necesita
+# un mongod real para números representativos (mongomock no tiene índices).
+#
+#   python -m bench.importacion --filas 200000 --lotes 1 100 1000 5000
+import argparse
+import os
+import tempfile
+
+from bench._comun import conectar, rss_kb
+from importacion import generar, importar, leer_filas
+from indices import crear_indices
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, default=200000)
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    db = conectar()
+    crear_indices(db)
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "catalogo.jsonl.gz")
+        generar(ruta, args.filas)
+        print(f"{'lote':>6} {'filas/s':>10} {'nuevas':>8} {'actualizadas':>13} {'RSS máx (KB)':>13}")
+        for lote in args.lotes:
+            db["productos"].delete_many({})
+            estadisticas = importar(db["productos"], leer_filas(ruta), lote=lote)
+            print(f"{lote:>6} {estadisticas['leidas'] / estadisticas['segundos']:>10,.0f} "
+                  f"{estadisticas['insertadas']:>8} {estadisticas['actualizadas']:>13} {rss_kb():>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Genera millones de números de orden desde varios procesos contra el mismo
+# contador y verifica que no haya ni un duplicado. Necesita un mongod real.
+#
+#   python -m bench.ordenes --procesos 8 --por-proceso 250000
+from multiprocessing import get_context
+import argparse
+import os
+import tempfile
+import time
+
+from bench._comun import conectar
+from ordenes import GeneradorOrdenes
+
+def generar(ruta, cantidad, lote):
+    generador = GeneradorOrdenes(conectar()["meta"], lote=lote)
+    anterior = ""
+    with open(ruta, "w") as salida:
+        for _ in range(cantidad):
+            numero = generador.siguiente()
+            # Dentro de un proceso deben salir en orden creciente
+            assert numero > anterior, (anterior, numero)
+            anterior = numero
+            salida.write(numero + "\n")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--procesos", type=int, default=8)
+    parser.add_argument("--por-proceso", type=int, default=250000)
+    parser.add_argument("--lote", type=int, default=1000)
+    args = parser.parse_args()
+
+    conectar()["meta"].delete_one({"_id": "ordenes"})
+    ctx = get_context("spawn")
+    with tempfile.TemporaryDirectory() as carpeta:
+        rutas = [os.path.join(carpeta, f"{i}.txt") for i in range(args.procesos)]
+        inicio = time.perf_counter()
+        procesos = [ctx.Process(target=generar, args=(ruta, args.por_proceso, args.lote)) for ruta in rutas]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+            if proceso.exitcode != 0:
+                raise SystemExit(f"un proceso terminó con código {proceso.exitcode}")
+        segundos = time.perf_counter() - inicio
+
+        vistos = set()
+        total = 0
+        for ruta in rutas:
+            with open(ruta) as entrada:
+                for linea in entrada:
+                    vistos.add(linea)
+                    total += 1
+
+    colisiones = total - len(vistos)
+    print(f"{total} números en {segundos:.2f} s ({total / segundos:,.0f}/s), colisiones: {colisiones}")
+    if colisiones:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Compara el listado completo (list(productos.find())) contra la paginación
+# por cursor de catalogo.paginar_productos.
+#
+#   python -m bench.paginacion 1000 100000 1000000
+#
+# Cada medición corre en un proceso nuevo para que el pico de RSS sea propio,
+# por eso este benchmark necesita un mongod real (no sirve mongomock://).
+from multiprocessing import get_context
+import sys
+
+from bench._comun import conectar, cronometrar, rss_kb, sembrar_productos
+from catalogo import paginar_productos
+
+def _medir(modo, cola):
+    productos = conectar()["productos"]
+    base = rss_kb()
+    if modo == "completo":
+        segundos, docs = cronometrar(lambda: list(productos.find()))
+    else:
+        segundos, (docs, _, _) = cronometrar(lambda: paginar_productos(productos))
+    cola.put((segundos, len(docs), rss_kb() - base))
+
+def main(tamanos):
+    ctx = get_context("spawn")
+    productos = conectar()["productos"]
+    print(f"{'productos':>10} {'modo':>10} {'ms':>10} {'docs':>8} {'RSS +KB':>10}")
+    for n in tamanos:
+        sembrar_productos(productos, n)
+        for modo in ("completo", "paginado"):
+            cola = ctx.Queue()
+            proceso = ctx.Process(target=_medir, args=(modo, cola))
+            proceso.start()
+            segundos, docs, rss = cola.get()
+            proceso.join()
+            print(f"{n:>10} {modo:>10} {segundos * 1000:>10.1f} {docs:>8} {rss:>10}")
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 100000, 1000000])
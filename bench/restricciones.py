@@ -0,0 +1,69 @@
+# Clasificador de productos restringidos: la versión anterior (lista nueva y
+# lower() por llamada) contra la expresión compilada con caché y contra leer
+# el booleano precalculado. Antes de medir, verifica la matriz de casos con
+# acentos y mayúsculas.
+#
+#   python -m bench.restricciones
+import timeit
+
+from restricciones import es_categoria_restringida, es_producto_restringido
+
+MATRIZ = {
+    "alcohol": True,
+    "Alcohol": True,
+    "ALCOHOL": True,
+    "Cervezas Artesanales": True,
+    "cerveza": True,
+    "Vinos y Licores": True,
+    "Licorería": True,
+    "LICORERÍA": True,
+    "Tabaquería": True,
+    "TABAQUERIA": True,
+    "Tabacalera": True,
+    "Tabaco y Cigarros": True,
+    "Cigarrillos": True,
+    "Puros y cigarro": True,
+    "cigarros": True,
+    "Cigarrós": True,
+    "Vino Tinto": True,
+    "Vinagres": False,
+    "refrescos": False,
+    "Dulces": False,
+    "Sabritas": False,
+    "Lácteos": False,
+    "": False,
+    None: False,
+}
+
+def es_producto_restringido_anterior(categoria):
+    categorias_restringidas = ['alcohol', 'cigarros', 'licor', 'cerveza', 'tabaco', 'vino']
+    if categoria:
+        return any(restr in categoria.lower() for restr in categorias_restringidas)
+    return False
+
+def verificar_matriz():
+    errores = [(c, e) for c, e in MATRIZ.items() if es_categoria_restringida(c) is not e]
+    for categoria, esperado in errores:
+        print(f"FALLA: {categoria!r} debería ser {esperado}")
+    if errores:
+        raise SystemExit(1)
+    print(f"Matriz OK ({len(MATRIZ)} casos)")
+
+def main(n=200000):
+    verificar_matriz()
+    categorias = [c for c in MATRIZ if c]
+    producto_viejo = {"category": "Cervezas Artesanales"}
+    producto_marcado = {"category": "Cervezas Artesanales", "restringido": True}
+
+    casos = {
+        "anterior": lambda: [es_producto_restringido_anterior(c) for c in categorias],
+        "compilado + caché": lambda: [es_categoria_restringida(c) for c in categorias],
+        "campo sin precalcular": lambda: [es_producto_restringido(producto_viejo) for _ in categorias],
+        "campo precalculado": lambda: [es_producto_restringido(producto_marcado) for _ in categorias],
+    }
+    for nombre, funcion in casos.items():
+        segundos = timeit.timeit(funcion, number=n // len(categorias))
+        print(f"{nombre:>22}: {segundos / n * 1e9:>7.0f} ns/llamada")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Mide el tamaño de la cookie de sesión y el CPU de firmarla/verificarla con
+# el carrito completo dentro de la sesión (antes) contra solo `carrito_id`
+# (después). No necesita MongoDB.
+#
+#   python -m bench.sesion_cookie 1 10 50 100
+import sys
+import time
+import uuid
+
+from bson import ObjectId
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+
+def sesion_antes(n):
+    return {
+        "usuario": "cliente_frecuente",
+        "mayor_edad": True,
+        "carrito": [{
+            "_id": str(ObjectId()),
+            "name": f"Cerveza Modelo Especial 355 ml pack {i}",
+            "price": 189.0,
+            "img": f"https://i5.walmartimages.com.mx/gr/images/product-images/img_large/{i:014d}L.jpg",
+            "category": "alcohol",
+            "cantidad": 2
+        } for i in range(n)],
+    }
+
+def sesion_despues(n):
+    return {"usuario": "cliente_frecuente", "mayor_edad": True, "carrito_id": uuid.uuid4().hex}
+
+def medir(serializador, datos, repeticiones=2000):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        cookie = serializador.dumps(datos)
+        serializador.loads(cookie)
+    return len(cookie), (time.perf_counter() - inicio) / repeticiones * 1e6
+
+def main(tamanos):
+    app = Flask(__name__)
+    app.secret_key = "bench"
+    serializador = SecureCookieSessionInterface().get_signing_serializer(app)
+    print(f"{'items':>6} {'bytes antes':>12} {'µs antes':>10} {'bytes después':>14} {'µs después':>11}")
+    for n in tamanos:
+        bytes_antes, us_antes = medir(serializador, sesion_antes(n))
+        bytes_despues, us_despues = medir(serializador, sesion_despues(n))
+        # La cookie viaja en la respuesta (Set-Cookie) y en cada petición (Cookie)
+        print(f"{n:>6} {bytes_antes:>12} {us_antes:>10.1f} {bytes_despues:>14} {us_despues:>11.1f}")
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1, 10, 25, 50])
@@ -0,0 +1,115 @@
+from bisect import bisect_left
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from catalogo import PROYECCION_TARJETA, version_catalogo
+from conexion import por_base
+
+# ------------------ CONFIGURACIÓN DEL BUSCADOR ------------------
+LIMITE_RESULTADOS = int(os.environ.get("SIX_BUSQUEDA_LIMITE", "48"))
+# El índice se reconstruye solo cuando cambia la versión del catálogo
+# (marcar_cambio). Reconstruirlo cuesta leer todo el catálogo dentro de una
+# petición, así que SIX_BUSQUEDA_TTL (segundos) queda apagado: es un
+# respaldo opcional por si algo escribe productos sin marcar el cambio.
+TTL_INDICE = float(os.environ.get("SIX_BUSQUEDA_TTL", "0"))
+
+# Peso de cada campo en la relevancia
+PESOS = {"name": 3.0, "brand": 2.0, "category": 1.0}
+# Un término que solo coincide como prefijo ("cerv" -> "cerveza") vale menos
+FACTOR_PREFIJO = 0.5
+
+_PALABRA = re.compile(r"\w+")
+
+# ------------------ NORMALIZACIÓN ------------------
+def normalizar(texto):
+    # Minúsculas y sin acentos: "Jamón" y "jamon" son el mismo término
+    texto = unicodedata.normalize("NFD", str(texto).lower())
+    return "".join(c for c in texto if unicodedata.category(c) != "Mn")
+
+def tokenizar(texto):
+    if not texto:
+        return []
+    return _PALABRA.findall(normalizar(texto))
+
+# ------------------ ÍNDICE INVERTIDO ------------------
+class IndiceBusqueda:
+    def __init__(self, ttl=TTL_INDICE):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._datos = None
+
+    def _construir(self, coleccion, version):
+        ids = []
+        postings = {}
+        for doc in coleccion.find({}, {campo: 1 for campo in PESOS}):
+            posicion = len(ids)
+            ids.append(doc["_id"])
+            for campo, peso in PESOS.items():
+                for token in tokenizar(doc.get(campo)):
+                    docs = postings.setdefault(token, {})
+                    if docs.get(posicion, 0) < peso:
+                        docs[posicion] = peso
+        return ids, postings, sorted(postings), time.monotonic(), version
+
+    def _vigente(self, coleccion):
+        datos = self._datos
+        version = version_catalogo(coleccion)
+        if datos is not None and datos[4] == version and (
+                not self.ttl or time.monotonic() - datos[3] < self.ttl):
+            return datos
+        # Solo un hilo reconstruye; los demás siguen con el índice anterior
+        if not self._lock.acquire(blocking=datos is None):
+            return datos
+        try:
+            if self._datos is datos:
+                self._datos = self._construir(coleccion, version)
+            return self._datos
+        finally:
+            self._lock.release()
+
+    def buscar(self, coleccion, q, limite=LIMITE_RESULTADOS):
+        terminos = tokenizar(q)
+        if not terminos:
+            return []
+        ids, postings, vocabulario, _, _ = self._vigente(coleccion)
+
+        # Todos los términos deben coincidir (AND); cada uno como prefijo
+        puntajes = None
+        for termino in terminos:
+            parcial = {}
+            i = bisect_left(vocabulario, termino)
+            while i < len(vocabulario) and vocabulario[i].startswith(termino):
+                token = vocabulario[i]
+                factor = 1.0 if token == termino else FACTOR_PREFIJO
+                for posicion, peso in postings[token].items():
+                    valor = peso * factor
+                    if parcial.get(posicion, 0) < valor:
+                        parcial[posicion] = valor
+                i += 1
+            if puntajes is None:
+                puntajes = parcial
+            else:
+                puntajes = {p: puntajes[p] + v for p, v in parcial.items() if p in puntajes}
+            if not puntajes:
+                return []
+
+        mejores = heapq.nlargest(limite, puntajes.items(), key=lambda par: par[1])
+        return [ids[posicion] for posicion, _ in mejores]
+
+def buscar_productos(coleccion, q, limite=LIMITE_RESULTADOS):
+    # El texto del usuario nunca llega a MongoDB como regex: solo se usa para
+    # consultar el índice, y Mongo recibe una lista de _id ya resuelta. Hay
+    # un índice por base, como la caché del catálogo.
+    indice = por_base(coleccion.database, "busqueda", IndiceBusqueda)
+    ids = indice.buscar(coleccion, q, limite)
+    if not ids:
+        return []
+    encontrados = {
+        doc["_id"]: doc
+        for doc in coleccion.find({"_id": {"$in": ids}}, PROYECCION_TARJETA)
+    }
+    return [encontrados[i] for i in ids if i in encontrados]
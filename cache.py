@@ -0,0 +1,52 @@
+from collections import OrderedDict
+import threading
+import time
+
+# Marca para distinguir "no está en caché" de un valor guardado como None
+FALTA = object()
+
+# ------------------ CACHÉ LRU CON TTL ------------------
+class CacheLRU:
+    def __init__(self, max_entradas=1000, ttl=60):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._datos[clave]
+                self.fallos += 1
+                return FALTA
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsiones": self.expulsiones,
+            }
@@ -0,0 +1,92 @@
+from bson import ObjectId
+from datetime import datetime
+import os
+import threading
+
+# ------------------ ALMACÉN DE CARRITOS DEL LADO DEL SERVIDOR ------------------
+# La cookie de sesión solo guarda `carrito_id`; el contenido del carrito
+# ({producto_id: cantidad}) vive aquí.
+
+def _validar_producto(producto_id):
+    # El id se usa como nombre de campo en Mongo: nada de "." ni "$"
+    if not ObjectId.is_valid(producto_id):
+        raise ValueError(f"producto_id inválido: {producto_id!r}")
+    return str(producto_id)
+
+class CarritoMongo:
+    def __init__(self, coleccion):
+        self.coleccion = coleccion
+
+    def obtener(self, carrito_id):
+        doc = self.coleccion.find_one({"_id": carrito_id}, {"items": 1})
+        return dict(doc.get("items", {})) if doc else {}
+
+    def agregar(self, carrito_id, producto_id, cantidad=1):
+        producto_id = _validar_producto(producto_id)
+        self.coleccion.update_one(
+            {"_id": carrito_id},
+            {"$inc": {f"items.{producto_id}": cantidad},
+             "$set": {"actualizado": datetime.now()}},
+            upsert=True
+        )
+
+    def actualizar(self, carrito_id, producto_id, cantidad):
+        producto_id = _validar_producto(producto_id)
+        # Solo si el producto ya está en el carrito
+        self.coleccion.update_one(
+            {"_id": carrito_id, f"items.{producto_id}": {"$exists": True}},
+            {"$set": {f"items.{producto_id}": cantidad,
+                      "actualizado": datetime.now()}}
+        )
+
+    def eliminar(self, carrito_id, producto_id):
+        producto_id = _validar_producto(producto_id)
+        self.coleccion.update_one(
+            {"_id": carrito_id},
+            {"$unset": {f"items.{producto_id}": ""},
+             "$set": {"actualizado": datetime.now()}}
+        )
+
+    def vaciar(self, carrito_id):
+        self.coleccion.delete_one({"_id": carrito_id})
+
+class CarritoMemoria:
+    # Sustituto en memoria para pruebas y desarrollo local (no se comparte
+    # entre workers de gunicorn)
+    def __init__(self):
+        self._carritos = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, carrito_id):
+        with self._lock:
+            return dict(self._carritos.get(carrito_id, {}))
+
+    def agregar(self, carrito_id, producto_id, cantidad=1):
+        producto_id = _validar_producto(producto_id)
+        with self._lock:
+            items = self._carritos.setdefault(carrito_id, {})
+            items[producto_id] = items.get(producto_id, 0) + cantidad
+
+    def actualizar(self, carrito_id, producto_id, cantidad):
+        producto_id = _validar_producto(producto_id)
+        with self._lock:
+            items = self._carritos.get(carrito_id, {})
+            if producto_id in items:
+                items[producto_id] = cantidad
+
+    def eliminar(self, carrito_id, producto_id):
+        producto_id = _validar_producto(producto_id)
+        with self._lock:
+            self._carritos.get(carrito_id, {}).pop(producto_id, None)
+
+    def vaciar(self, carrito_id):
+        with self._lock:
+            self._carritos.pop(carrito_id, None)
+
+def crear_almacen(db, backend=None):
+    backend = backend or os.environ.get("SIX_CARRITO_BACKEND", "mongo")
+    if backend == "memoria":
+        return CarritoMemoria()
+    if backend == "mongo":
+        return CarritoMongo(db["carritos"])
+    raise ValueError(f"SIX_CARRITO_BACKEND desconocido: {backend}")
@@ -0,0 +1,154 @@
+from bson import ObjectId
+import os
+import threading
+import time
+
+from cache import FALTA, CacheLRU
+from conexion import por_base
+
+# ------------------ CONFIGURACIÓN DEL CATÁLOGO ------------------
+PRODUCTOS_POR_PAGINA = int(os.environ.get("SIX_PRODUCTOS_POR_PAGINA", "24"))
+
+# Solo los campos que pinta la tarjeta de _grilla_productos.html
+PROYECCION_TARJETA = {
+    "name": 1,
+    "price": 1,
+    "oldPrice": 1,
+    "img": 1,
+    "miniaturas": 1,
+    "category": 1,
+    "brand": 1,
+    "restringido": 1,
+}
+
+# Cada cuántos segundos se consulta el contador de versión del catálogo
+INTERVALO_VERSION = float(os.environ.get("SIX_CATALOGO_VERSION_INTERVALO", "5"))
+
+# Caché de productos por id y páginas de listado, con la versión que la
+# invalida. Una por base (conexion.por_base): dos apps contra bases
+# distintas no comparten páginas aunque coincida el número de versión.
+class EstadoCatalogo:
+    def __init__(self):
+        self.cache = CacheLRU(
+            max_entradas=int(os.environ.get("SIX_CACHE_MAX", "2000")),
+            ttl=float(os.environ.get("SIX_CACHE_TTL", "300"))
+        )
+        self.version = {"valor": None, "modificado": None, "revisado": 0.0}
+        self.lock = threading.Lock()
+
+def _estado(coleccion):
+    return por_base(coleccion.database, "catalogo", EstadoCatalogo)
+
+def cache_catalogo(coleccion):
+    return _estado(coleccion).cache
+
+# ------------------ VERSIÓN DEL CATÁLOGO ------------------
+# Quien modifique `productos` debe llamar a marcar_cambio(); el contador vive
+# en la colección `meta` para que todos los workers vean el cambio.
+def _documento_version(coleccion):
+    return coleccion.database["meta"]
+
+def version_catalogo(coleccion):
+    estado = _estado(coleccion)
+    version = estado.version
+    ahora = time.monotonic()
+    if version["valor"] is not None and ahora - version["revisado"] < INTERVALO_VERSION:
+        return version["valor"]
+    with estado.lock:
+        doc = _documento_version(coleccion).find_one({"_id": "catalogo"}, {"version": 1, "modificado": 1}) or {}
+        nueva = doc.get("version", 0)
+        if nueva != version["valor"]:
+            estado.cache.limpiar()
+        version["valor"] = nueva
+        version["modificado"] = doc.get("modificado")
+        version["revisado"] = ahora
+        return nueva
+
+def modificado_catalogo(coleccion):
+    # Fecha del último marcar_cambio() (None en catálogos que nunca lo
+    # registraron); sirve como Last-Modified de las páginas del catálogo
+    version_catalogo(coleccion)
+    return _estado(coleccion).version["modificado"]
+
+def marcar_cambio(coleccion):
+    _documento_version(coleccion).update_one(
+        {"_id": "catalogo"},
+        {"$inc": {"version": 1}, "$currentDate": {"modificado": True}},
+        upsert=True
+    )
+    # Este worker se entera de inmediato; los demás al vencer su intervalo
+    estado = _estado(coleccion)
+    estado.version["revisado"] = 0.0
+    estado.cache.limpiar()
+
+# ------------------ PRODUCTO POR ID ------------------
+def obtener_producto(coleccion, producto_id):
+    if not ObjectId.is_valid(producto_id):
+        return None
+    version = version_catalogo(coleccion)
+    clave = ("producto", version, str(producto_id))
+    cache = cache_catalogo(coleccion)
+    producto = cache.obtener(clave)
+    if producto is FALTA:
+        producto = coleccion.find_one({"_id": ObjectId(producto_id)})
+        cache.guardar(clave, producto)
+    return producto
+
+# ------------------ PAGINACIÓN POR CURSOR (_id) ------------------
+def _cursor_valido(valor):
+    if valor and ObjectId.is_valid(valor):
+        return ObjectId(valor)
+    return None
+
+def paginar_productos(coleccion, filtro=None, despues=None, antes=None, por_pagina=None):
+    por_pagina = por_pagina or PRODUCTOS_POR_PAGINA
+    clave = (
+        "pagina",
+        version_catalogo(coleccion),
+        tuple(sorted((filtro or {}).items())),
+        despues,
+        antes,
+        por_pagina,
+    )
+    cache = cache_catalogo(coleccion)
+    pagina = cache.obtener(clave)
+    if pagina is FALTA:
+        pagina = _consultar_pagina(coleccion, filtro, despues, antes, por_pagina)
+        cache.guardar(clave, pagina)
+    return pagina
+
+def _consultar_pagina(coleccion, filtro, despues, antes, por_pagina):
+    # Paginación keyset sobre _id: nunca usa skip(), así que la página N
+    # cuesta lo mismo que la primera. Se pide un documento de más para
+    # saber si existe otra página en esa dirección sin hacer un count.
+    filtro = dict(filtro or {})
+    despues = _cursor_valido(despues)
+    antes = _cursor_valido(antes)
+
+    if antes is not None:
+        filtro["_id"] = {"$lt": antes}
+        orden = -1
+    else:
+        if despues is not None:
+            filtro["_id"] = {"$gt": despues}
+        orden = 1
+
+    pagina = list(
+        coleccion.find(filtro, PROYECCION_TARJETA)
+        .sort("_id", orden)
+        .limit(por_pagina + 1)
+    )
+    hay_mas = len(pagina) > por_pagina
+    pagina = pagina[:por_pagina]
+
+    if orden == -1:
+        pagina.reverse()
+        hay_siguiente = True
+        hay_anterior = hay_mas
+    else:
+        hay_siguiente = hay_mas
+        hay_anterior = despues is not None
+
+    siguiente = str(pagina[-1]["_id"]) if pagina and hay_siguiente else None
+    anterior = str(pagina[0]["_id"]) if pagina and hay_anterior else None
+    return pagina, siguiente, anterior
@@ -0,0 +1,145 @@
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+import os
+import threading
+import time
+
+from conexion import por_base, resolver
+from indices import crear_indice
+from metricas import log
+
+# ------------------ CHECKOUT IDEMPOTENTE ------------------
+# 1. Se reclama la clave de idempotencia insertando la orden como
+#    "pendiente" (índice único en pagos.clave_idempotencia). Un doble envío
+#    o un reintento choca aquí y recibe la orden que ya existe.
+# 2. Se aparta el stock con updates condicionales ($gte + $inc), producto
+#    por producto. En el mismo update el producto anota la reserva
+#    (reservas.<orden>), así que siempre se sabe qué apartó cada orden. Si
+#    alguno no alcanza, se devuelve lo apartado y se borra la orden
+#    pendiente para poder reintentar.
+# 3. La orden pasa a "confirmada" y se borran sus anotaciones de reserva.
+# Los productos sin campo `stock` se consideran sin límite.
+#
+# Si el proceso muere entre 1 y 3, la orden queda "pendiente" con stock
+# apartado; liberar_pendientes() devuelve ese stock pasado el vencimiento.
+VENCIMIENTO_PENDIENTE = int(os.environ.get("SIX_PENDIENTE_MINUTOS", "10"))
+
+class StockInsuficiente(Exception):
+    def __init__(self, item):
+        super().__init__(f"Stock insuficiente para {item['name']}")
+        self.item = item
+
+def buscar_pago_previo(pagos, usuario, clave):
+    if not clave:
+        return None
+    return pagos.find_one({"usuario": usuario, "clave_idempotencia": clave})
+
+def _apartar(productos, orden_id, item):
+    producto_id = ObjectId(item["_id"])
+    resultado = productos.update_one(
+        {"_id": producto_id, "stock": {"$gte": item["cantidad"]}},
+        {"$inc": {"stock": -item["cantidad"]},
+         "$set": {f"reservas.{orden_id}": item["cantidad"]}}
+    )
+    if resultado.modified_count:
+        return True
+    sin_limite = productos.find_one({"_id": producto_id, "stock": {"$exists": False}}, {"_id": 1})
+    if sin_limite:
+        return False
+    raise StockInsuficiente(item)
+
+def _devolver(productos, orden_id, items):
+    # Solo devuelve lo que la orden tiene anotado: repetirlo no suma dos veces
+    for item in items:
+        productos.update_one(
+            {"_id": ObjectId(item["_id"]), f"reservas.{orden_id}": {"$exists": True}},
+            {"$inc": {"stock": item["cantidad"]}, "$unset": {f"reservas.{orden_id}": ""}}
+        )
+
+# Todo lo anterior depende del índice único: sin él dos envíos con la misma
+# clave crean dos órdenes y apartan el stock dos veces. Cada proceso lo
+# asegura antes de su primer checkout en cada colección de pagos y, si no
+# se puede, el pago no sigue.
+def _exigir_indice(pagos):
+    asegurados = por_base(pagos.database, "idempotencia", dict)
+    if pagos.name not in asegurados:
+        crear_indice(pagos, "pagos", "clave_idempotencia_unica")
+        asegurados[pagos.name] = True
+
+def procesar_pago(pagos, productos, clave, pago_data):
+    # Devuelve (orden, nueva). `nueva` es False si la clave ya se había usado;
+    # entonces `orden` es la otra, que puede seguir "pendiente" o ser None si
+    # ese intento falló y se borró.
+    _exigir_indice(pagos)
+    orden = dict(pago_data, clave_idempotencia=clave, estado="pendiente")
+    try:
+        pagos.insert_one(orden)
+    except DuplicateKeyError:
+        return buscar_pago_previo(pagos, pago_data["usuario"], clave), False
+
+    apartados = []
+    try:
+        for item in pago_data["carrito"]:
+            if _apartar(productos, orden["_id"], item):
+                apartados.append(item)
+    except Exception:
+        _devolver(productos, orden["_id"], apartados)
+        pagos.delete_one({"_id": orden["_id"]})
+        raise
+
+    confirmada = pagos.update_one({"_id": orden["_id"], "estado": "pendiente"},
+                                  {"$set": {"estado": "confirmada"}})
+    if not confirmada.modified_count:
+        # liberar_pendientes() la dio por abandonada mientras se procesaba
+        _devolver(productos, orden["_id"], apartados)
+        raise RuntimeError(f"La orden {orden['numero_orden']} venció antes de confirmarse")
+    if apartados:
+        productos.bulk_write([
+            UpdateOne({"_id": ObjectId(item["_id"])}, {"$unset": {f"reservas.{orden['_id']}": ""}})
+            for item in apartados
+        ], ordered=False)
+    orden["estado"] = "confirmada"
+    return orden, True
+
+# ------------------ ÓRDENES PENDIENTES ABANDONADAS ------------------
+# Un checkout termina en segundos (gunicorn corta a los
+# SIX_GUNICORN_TIMEOUT s): una orden pendiente con más de
+# SIX_PENDIENTE_MINUTOS es de un proceso que murió a mitad del pago.
+def liberar_pendientes(pagos, productos, minutos=None):
+    vencidas = ObjectId.from_datetime(
+        datetime.now(timezone.utc) - timedelta(minutes=VENCIMIENTO_PENDIENTE if minutos is None else minutos)
+    )
+    liberadas = 0
+    for orden in pagos.find({"estado": "pendiente", "_id": {"$lt": vencidas}}, {"_id": 1}):
+        # Se reclama borrándola: si el checkout revive, su confirmación
+        # condicional falla y no queda una orden confirmada sin stock
+        orden = pagos.find_one_and_delete({"_id": orden["_id"], "estado": "pendiente"},
+                                          projection={"carrito._id": 1, "carrito.cantidad": 1})
+        if orden:
+            _devolver(productos, orden["_id"], orden.get("carrito", []))
+            liberadas += 1
+    return liberadas
+
+_barrido_lock = threading.Lock()
+
+def _liberar_seguro(pagos, productos):
+    try:
+        liberadas = liberar_pendientes(pagos, productos)
+        if liberadas:
+            log.warning("Órdenes pendientes vencidas liberadas: %d", liberadas)
+    except Exception:
+        log.exception("Error al liberar órdenes pendientes")
+
+def programar_limpieza(pagos, productos):
+    # La llama la vista de pago: a lo sumo una pasada por proceso y base en
+    # cada intervalo de vencimiento, en segundo plano. Para un cron está
+    # `flask --app app liberar-pendientes`.
+    barrido = por_base(pagos.database, "barrido", dict)
+    ahora = time.monotonic()
+    with _barrido_lock:
+        if "ultimo" in barrido and ahora - barrido["ultimo"] < VENCIMIENTO_PENDIENTE * 60:
+            return
+        barrido["ultimo"] = ahora
+    threading.Thread(target=_liberar_seguro, args=(resolver(pagos), resolver(productos)), daemon=True).start()
@@ -0,0 +1,217 @@
+from flask.cli import with_appcontext
+from pymongo import UpdateOne
+import click
+import sys
+
+from analitica import actualizar_analitica
+from assets import construir
+from checkout import liberar_pendientes
+from conexion import db
+from edad import fecha_mayoria_edad, leer_fecha_nacimiento
+from historial import reconstruir_resumenes
+from imagenes import backfill
+from importacion import exportar, generar, importar, leer_filas
+from indices import crear_indices, verificar_planes
+from restricciones import clasificar_catalogo
+from vistas import pagos, productos, resumenes, usuarios
+
+# ---------------------------------------------------------
+# COMANDOS: ASSETS
+# flask --app app construir-assets
+# ---------------------------------------------------------
+@click.command("construir-assets")
+@with_appcontext
+def comando_construir_assets():
+    manifest = construir()
+    print(f"Assets publicados: {len(set(manifest.values()))} archivos para {len(manifest)} nombres")
+
+# ---------------------------------------------------------
+# COMANDOS: MINIATURAS
+# flask --app app generar-miniaturas [--procesos N] [--rehacer]
+# ---------------------------------------------------------
+@click.command("generar-miniaturas")
+@with_appcontext
+@click.option("--procesos", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+@click.option("--rehacer", is_flag=True, help="Regenerar también productos que ya tienen miniaturas")
+def comando_generar_miniaturas(procesos, rehacer):
+    procesados, fallidos = backfill(productos, procesos=procesos, rehacer=rehacer)
+    print(f"Productos con miniaturas nuevas: {procesados}, con error: {fallidos}")
+
+# ---------------------------------------------------------
+# COMANDOS: ÍNDICES
+# flask --app app crear-indices / flask --app app verificar-indices
+# ---------------------------------------------------------
+@click.command("crear-indices")
+@with_appcontext
+def comando_crear_indices():
+    fallas = 0
+    for coleccion, indice, error in crear_indices(db):
+        print(f"{coleccion}: {indice}" + (f"  ERROR {error}" if error else ""))
+        fallas += error is not None
+    if fallas:
+        sys.exit(1)
+
+@click.command("verificar-indices")
+@with_appcontext
+def comando_verificar_indices():
+    fallas = 0
+    for consulta, etapas, ok in verificar_planes(db):
+        print(f"{'OK ' if ok else 'COLLSCAN'} {consulta}: {' > '.join(etapas)}")
+        fallas += not ok
+    if fallas:
+        sys.exit(1)
+
+# ---------------------------------------------------------
+# COMANDOS: ÓRDENES PENDIENTES
+# flask --app app liberar-pendientes [--minutos N]
+# Devuelve el stock de los checkouts que quedaron a medias y borra sus
+# órdenes pendientes.
+# ---------------------------------------------------------
+@click.command("liberar-pendientes")
+@with_appcontext
+@click.option("--minutos", type=int, default=None, help="Antigüedad mínima (por defecto SIX_PENDIENTE_MINUTOS)")
+def comando_liberar_pendientes(minutos):
+    print(f"Órdenes pendientes liberadas: {liberar_pendientes(pagos, productos, minutos)}")
+
+# ---------------------------------------------------------
+# COMANDOS: RESÚMENES DE COMPRAS
+# flask --app app reconstruir-resumenes
+# ---------------------------------------------------------
+@click.command("reconstruir-resumenes")
+@with_appcontext
+def comando_reconstruir_resumenes():
+    print(f"Resúmenes reconstruidos: {reconstruir_resumenes(resumenes, pagos)}")
+
+# ---------------------------------------------------------
+# COMANDOS: ANALÍTICA DE VENTAS
+# flask --app app actualizar-analitica   (en un cron; procesa solo las
+#                                         órdenes nuevas desde la marca)
+# flask --app app reconstruir-analitica  (borra los resúmenes y recorre
+#                                         pagos desde el principio)
+# ---------------------------------------------------------
+@click.command("actualizar-analitica")
+@with_appcontext
+@click.option("--lote", type=int, default=None, help="Órdenes por lote")
+def comando_actualizar_analitica(lote):
+    procesadas = actualizar_analitica(db, lote=lote)
+    if procesadas is None:
+        print("Otra actualización está en curso")
+        sys.exit(1)
+    print(f"Órdenes procesadas: {procesadas}")
+
+@click.command("reconstruir-analitica")
+@with_appcontext
+@click.option("--lote", type=int, default=None, help="Órdenes por lote")
+def comando_reconstruir_analitica(lote):
+    procesadas = actualizar_analitica(db, lote=lote, desde_cero=True)
+    if procesadas is None:
+        print("Otra actualización está en curso")
+        sys.exit(1)
+    print(f"Órdenes procesadas: {procesadas}")
+
+# ---------------------------------------------------------
+# COMANDOS: PRODUCTOS RESTRINGIDOS
+# flask --app app clasificar-restringidos
+# Guarda el campo `restringido` en cada producto según la configuración
+# actual (SIX_PALABRAS_RESTRINGIDAS).
+# ---------------------------------------------------------
+@click.command("clasificar-restringidos")
+@with_appcontext
+def comando_clasificar_restringidos():
+    print(f"Productos actualizados: {clasificar_catalogo(productos)}")
+
+# ---------------------------------------------------------
+# COMANDOS: CATÁLOGO (IMPORTAR / EXPORTAR / GENERAR)
+# flask --app app importar-catalogo productos.csv [--lote 1000]
+# flask --app app exportar-catalogo respaldo.jsonl.gz
+# flask --app app generar-catalogo 1000000 sinteticos.jsonl
+# El formato sale de la extensión (.csv o .jsonl, opcionalmente .gz).
+# ---------------------------------------------------------
+@click.command("importar-catalogo")
+@with_appcontext
+@click.argument("archivo")
+@click.option("--lote", type=int, default=1000, help="Operaciones por bulk_write")
+@click.option("--formato", type=click.Choice(["csv", "jsonl"]), default=None)
+def comando_importar_catalogo(archivo, lote, formato):
+    reporte = {"ultimo": 0.0}
+
+    def al_avanzar(estadisticas, segundos):
+        if segundos - reporte["ultimo"] >= 5:
+            reporte["ultimo"] = segundos
+            print(f"  {estadisticas['leidas']} filas  {estadisticas['leidas'] / segundos:,.0f} filas/s")
+
+    estadisticas = importar(productos, leer_filas(archivo, formato), lote=lote, al_avanzar=al_avanzar)
+    for numero, error in estadisticas["errores"]:
+        print(f"⚠️ fila {numero}: {error}")
+    segundos = estadisticas["segundos"]
+    print(f"Filas: {estadisticas['leidas']} en {segundos:.1f}s "
+          f"({estadisticas['leidas'] / segundos if segundos else 0:,.0f} filas/s) | "
+          f"nuevas: {estadisticas['insertadas']}, actualizadas: {estadisticas['actualizadas']}, "
+          f"inválidas: {estadisticas['invalidas']}")
+
+@click.command("exportar-catalogo")
+@with_appcontext
+@click.argument("archivo")
+@click.option("--formato", type=click.Choice(["csv", "jsonl"]), default=None)
+def comando_exportar_catalogo(archivo, formato):
+    print(f"Productos exportados: {exportar(productos, archivo, formato)}")
+
+@click.command("generar-catalogo")
+@with_appcontext
+@click.argument("cantidad", type=int)
+@click.argument("archivo")
+@click.option("--formato", type=click.Choice(["csv", "jsonl"]), default=None)
+@click.option("--semilla", type=int, default=42)
+def comando_generar_catalogo(cantidad, archivo, formato, semilla):
+    print(f"Productos sintéticos escritos: {generar(archivo, cantidad, formato, semilla)}")
+
+# ---------------------------------------------------------
+# COMANDOS: MIGRACIÓN DE FECHAS DE NACIMIENTO
+# flask --app app migrar-fechas
+# Convierte fecha_nacimiento de texto a fecha, agrega mayor_desde y quita
+# los campos mayor_edad/edad_actual que se quedaban viejos.
+# ---------------------------------------------------------
+@click.command("migrar-fechas")
+@with_appcontext
+def comando_migrar_fechas():
+    operaciones = []
+    migrados = invalidos = 0
+    pendientes = usuarios.find(
+        {"mayor_desde": {"$exists": False}},
+        {"fecha_nacimiento": 1}
+    )
+    for user in pendientes:
+        try:
+            fecha_nacimiento = leer_fecha_nacimiento(user.get("fecha_nacimiento"))
+        except ValueError:
+            fecha_nacimiento = None
+        if not fecha_nacimiento:
+            invalidos += 1
+            continue
+        operaciones.append(UpdateOne(
+            {"_id": user["_id"]},
+            {"$set": {"fecha_nacimiento": fecha_nacimiento,
+                      "mayor_desde": fecha_mayoria_edad(fecha_nacimiento)},
+             "$unset": {"mayor_edad": "", "edad_actual": ""}}
+        ))
+        if len(operaciones) >= 1000:
+            migrados += usuarios.bulk_write(operaciones, ordered=False).modified_count
+            operaciones = []
+    if operaciones:
+        migrados += usuarios.bulk_write(operaciones, ordered=False).modified_count
+    print(f"Usuarios migrados: {migrados}, sin fecha válida: {invalidos}")
+
+def registrar_comandos(app):
+    app.cli.add_command(comando_construir_assets)
+    app.cli.add_command(comando_generar_miniaturas)
+    app.cli.add_command(comando_crear_indices)
+    app.cli.add_command(comando_verificar_indices)
+    app.cli.add_command(comando_liberar_pendientes)
+    app.cli.add_command(comando_reconstruir_resumenes)
+    app.cli.add_command(comando_actualizar_analitica)
+    app.cli.add_command(comando_reconstruir_analitica)
+    app.cli.add_command(comando_clasificar_restringidos)
+    app.cli.add_command(comando_importar_catalogo)
+    app.cli.add_command(comando_exportar_catalogo)
+    app.cli.add_command(comando_generar_catalogo)
+    app.cli.add_command(comando_migrar_fechas)
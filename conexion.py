@@ -0,0 +1,171 @@
+from flask import current_app, has_app_context
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+import os
+import threading
+
+from metricas import monitor_comandos
+
+# ------------------ CONFIGURACIÓN DE LA CONEXIÓN ------------------
+# Sin credenciales en el código: en producción MONGO_URI viene del entorno.
+# Son los valores fuera de una app; cada app de create_app() usa los de su
+# app.config.
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/six")
+MONGO_DB = os.environ.get("MONGO_DB", "six")
+
+def opciones_cliente():
+    return {
+        "maxPoolSize": int(os.environ.get("SIX_MONGO_MAX_POOL", "50")),
+        "minPoolSize": int(os.environ.get("SIX_MONGO_MIN_POOL", "0")),
+        "maxIdleTimeMS": int(os.environ.get("SIX_MONGO_MAX_IDLE_MS", "60000")),
+        "waitQueueTimeoutMS": int(os.environ.get("SIX_MONGO_WAIT_QUEUE_MS", "2000")),
+        "serverSelectionTimeoutMS": int(os.environ.get("SIX_MONGO_SELECCION_MS", "5000")),
+        "connectTimeoutMS": int(os.environ.get("SIX_MONGO_CONNECT_MS", "5000")),
+        "socketTimeoutMS": int(os.environ.get("SIX_MONGO_SOCKET_MS", "10000")),
+        "readPreference": os.environ.get("SIX_MONGO_READ_PREFERENCE", "primaryPreferred"),
+    }
+
+# ------------------ ESTADÍSTICAS DEL POOL ------------------
+class EstadisticasPool(ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.abiertas = 0
+        self.en_uso = 0
+        self.esperando = 0
+        self.checkouts = 0
+        self.checkouts_fallidos = 0
+        self.limpiezas = 0
+
+    def _sumar(self, **cambios):
+        with self._lock:
+            for campo, delta in cambios.items():
+                setattr(self, campo, getattr(self, campo) + delta)
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def pool_cleared(self, event):
+        self._sumar(limpiezas=1)
+
+    def connection_created(self, event):
+        self._sumar(abiertas=1)
+
+    def connection_closed(self, event):
+        self._sumar(abiertas=-1)
+
+    def connection_check_out_started(self, event):
+        self._sumar(esperando=1)
+
+    def connection_check_out_failed(self, event):
+        self._sumar(esperando=-1, checkouts_fallidos=1)
+
+    def connection_checked_out(self, event):
+        self._sumar(esperando=-1, en_uso=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._sumar(en_uso=-1)
+
+    def como_dict(self):
+        with self._lock:
+            return {
+                "abiertas": self.abiertas,
+                "en_uso": self.en_uso,
+                "esperando": self.esperando,
+                "checkouts": self.checkouts,
+                "checkouts_fallidos": self.checkouts_fallidos,
+                "limpiezas": self.limpiezas,
+            }
+
+# ------------------ UN CLIENTE POR PROCESO Y URI ------------------
+# Cada cliente se crea en el primer uso y se vuelven a crear todos si el pid
+# cambió: un proceso hijo de gunicorn nunca reutiliza los sockets de su
+# padre. Dos apps con la misma URI comparten el pool.
+_estado = {"pid": None, "clientes": {}}
+_lock = threading.Lock()
+
+def destino():
+    # (uri, base) de la app actual; fuera de una app, los del entorno
+    if has_app_context():
+        return current_app.config["MONGO_URI"], current_app.config["MONGO_DB"]
+    return MONGO_URI, MONGO_DB
+
+def _cliente_y_estadisticas(uri):
+    clientes = _estado["clientes"]
+    if _estado["pid"] == os.getpid() and uri in clientes:
+        return clientes[uri]
+    with _lock:
+        if _estado["pid"] != os.getpid():
+            _estado.update(pid=os.getpid(), clientes={})
+        clientes = _estado["clientes"]
+        if uri not in clientes:
+            estadisticas = EstadisticasPool()
+            cliente = MongoClient(
+                uri,
+                connect=False,
+                event_listeners=[estadisticas, monitor_comandos],
+                **opciones_cliente()
+            )
+            clientes[uri] = (cliente, estadisticas)
+        return clientes[uri]
+
+def obtener_cliente(uri=None):
+    return _cliente_y_estadisticas(uri or destino()[0])[0]
+
+def obtener_db():
+    uri, nombre = destino()
+    return obtener_cliente(uri)[nombre]
+
+def estadisticas_pool():
+    datos = _cliente_y_estadisticas(destino()[0])[1].como_dict()
+    datos["pid"] = _estado["pid"]
+    datos["max_pool"] = opciones_cliente()["maxPoolSize"]
+    return datos
+
+# ------------------ ESTADO POR BASE ------------------
+# Lo que depende de los datos de una base (caché del catálogo, índice de
+# búsqueda, "una vez por base") se guarda por base real: dos apps o scripts
+# contra bases distintas nunca se sirven lo de la otra. La clave usa la
+# identidad del cliente y la entrada lo retiene, así que el id no se reusa.
+_por_base = {}
+_por_base_lock = threading.Lock()
+
+def por_base(base, tipo, crear):
+    cliente = base.client
+    clave = (tipo, os.getpid(), id(cliente), base.name)
+    entrada = _por_base.get(clave)
+    if entrada is None:
+        with _por_base_lock:
+            entrada = _por_base.get(clave)
+            if entrada is None:
+                entrada = _por_base[clave] = (cliente, crear())
+    return entrada[1]
+
+# ------------------ COLECCIONES PEREZOSAS ------------------
+# Se pueden declarar como globales del módulo al importar; la colección real
+# se resuelve contra el cliente del proceso actual en cada uso.
+class ColeccionPerezosa:
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __getattr__(self, atributo):
+        return getattr(obtener_db()[self.nombre], atributo)
+
+class BaseDatosPerezosa:
+    def __getitem__(self, nombre):
+        return ColeccionPerezosa(nombre)
+
+    def __getattr__(self, atributo):
+        return getattr(obtener_db(), atributo)
+
+def resolver(objeto):
+    # Antes de pasar una colección o base perezosa a otro hilo: el hilo no
+    # tiene el contexto de la app, así que se fija la de esta petición
+    if isinstance(objeto, ColeccionPerezosa):
+        return obtener_db()[objeto.nombre]
+    if isinstance(objeto, BaseDatosPerezosa):
+        return obtener_db()
+    return objeto
+
+db = BaseDatosPerezosa()
@@ -0,0 +1,20 @@
+import os
+
+# ------------------ CONFIGURACIÓN DESDE EL ENTORNO ------------------
+# create_app() parte de esto y encima aplica lo que reciba (pruebas,
+# benchmarks). Las claves vacías dejan el valor por defecto de cada módulo.
+CLAVE_DESARROLLO = "clave_super_secreta_six"
+FALTA_CLAVE = "Falta SECRET_KEY (o SIX_SECRET_KEY) en el entorno"
+
+def desde_entorno():
+    return {
+        "SECRET_KEY": os.environ.get("SECRET_KEY") or os.environ.get("SIX_SECRET_KEY"),
+        "MONGO_URI": os.environ.get("MONGO_URI"),
+        "MONGO_DB": os.environ.get("MONGO_DB"),
+        "CARRITO_BACKEND": os.environ.get("SIX_CARRITO_BACKEND", "mongo"),
+        # Usuarios que ven /admin/analitica: SIX_ADMINS="ana,beto"
+        "ADMINS": {u.strip() for u in os.environ.get("SIX_ADMINS", "").split(",") if u.strip()},
+        # Los índices se aseguran en la primera petición de cada worker,
+        # no al importar
+        "CREAR_INDICES": os.environ.get("SIX_CREAR_INDICES", "1") == "1",
+    }
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TiempoAgotado
+import base64
+import hashlib
+import hmac
+import os
+import threading
+
+# ------------------ CONFIGURACIÓN DEL HASH ------------------
+# scrypt de la librería estándar; el costo se ajusta sin migrar datos porque
+# cada hash guarda sus propios parámetros.
+SCRYPT_N = int(os.environ.get("SIX_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("SIX_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("SIX_SCRYPT_P", "1"))
+# Hilos dedicados a hashear: acota el CPU que se lleva un pico de logins
+HILOS_HASH = int(os.environ.get("SIX_HASH_HILOS", "2"))
+TIMEOUT_HASH = float(os.environ.get("SIX_HASH_TIMEOUT", "10"))
+# Trabajos que pueden esperar turno además de los que corren; con la cola
+# llena se rechaza de inmediato en lugar de alargar la espera de todos
+COLA_HASH = int(os.environ.get("SIX_HASH_COLA", str(HILOS_HASH * 8)))
+
+_PREFIJO = "scrypt"
+
+def _scrypt(contrasena, sal, n, r, p):
+    return hashlib.scrypt(
+        contrasena.encode("utf-8"), salt=sal, n=n, r=r, p=p,
+        maxmem=256 * n * r, dklen=32
+    )
+
+def _b64(datos):
+    return base64.b64encode(datos).decode("ascii")
+
+def hashear(contrasena, n=None, r=None, p=None):
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    sal = os.urandom(16)
+    return f"{_PREFIJO}${n}${r}${p}${_b64(sal)}${_b64(_scrypt(contrasena, sal, n, r, p))}"
+
+def verificar(almacenada, contrasena):
+    # Devuelve (ok, rehashear). Los registros viejos en texto plano se
+    # aceptan una vez y se piden rehashear, igual que los hashes con un
+    # costo distinto al configurado.
+    if not almacenada:
+        return False, False
+    if not almacenada.startswith(_PREFIJO + "$"):
+        ok = hmac.compare_digest(almacenada.encode("utf-8"), contrasena.encode("utf-8"))
+        return ok, ok
+    try:
+        _, n, r, p, sal, esperado = almacenada.split("$")
+        n, r, p = int(n), int(r), int(p)
+        calculado = _scrypt(contrasena, base64.b64decode(sal), n, r, p)
+    except ValueError:
+        return False, False
+    ok = hmac.compare_digest(calculado, base64.b64decode(esperado))
+    return ok, ok and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+# ------------------ POOL DE HASHEO ------------------
+# hashlib.scrypt suelta el GIL, así que estos hilos corren en paralelo con
+# los que atienden el catálogo. Con workers gevent se usa el threadpool del
+# hub (hilos reales) para no bloquear el loop.
+_pool = ThreadPoolExecutor(max_workers=HILOS_HASH, thread_name_prefix="hash")
+_cupos = threading.BoundedSemaphore(HILOS_HASH + COLA_HASH)
+
+class HasheoSaturado(Exception):
+    pass
+
+def _gevent_activo():
+    try:
+        from gevent.monkey import is_module_patched
+    except ImportError:
+        return False
+    return is_module_patched("threading")
+
+def _en_pool(funcion, *args):
+    # El cupo se libera cuando el trabajo termina (o se cancela sin haber
+    # empezado), no cuando el que lo pidió deja de esperar
+    if not _cupos.acquire(blocking=False):
+        raise HasheoSaturado("cola de hasheo llena")
+    if _gevent_activo():
+        from gevent import Timeout, get_hub
+        resultado = get_hub().threadpool.spawn(funcion, *args)
+        resultado.rawlink(lambda _: _cupos.release())
+        try:
+            return resultado.get(timeout=TIMEOUT_HASH)
+        except Timeout:
+            raise HasheoSaturado("el hasheo tardó demasiado")
+    futuro = _pool.submit(funcion, *args)
+    futuro.add_done_callback(lambda _: _cupos.release())
+    try:
+        return futuro.result(timeout=TIMEOUT_HASH)
+    except TiempoAgotado:
+        futuro.cancel()
+        raise HasheoSaturado("el hasheo tardó demasiado")
+
+def hashear_contrasena(contrasena):
+    return _en_pool(hashear, contrasena)
+
+def verificar_contrasena(almacenada, contrasena):
+    return _en_pool(verificar, almacenada, contrasena)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+# ------------------ MAYORÍA DE EDAD ------------------
+EDAD_MINIMA = 18
+
+def fecha_mayoria_edad(fecha_nacimiento):
+    # Día en que se cumplen 18; quien nació un 29 de febrero los cumple el
+    # 1 de marzo si ese año no es bisiesto
+    anio = fecha_nacimiento.year + EDAD_MINIMA
+    try:
+        return datetime(anio, fecha_nacimiento.month, fecha_nacimiento.day)
+    except ValueError:
+        return datetime(anio, 3, 1)
+
+def leer_fecha_nacimiento(valor):
+    if isinstance(valor, str):
+        return datetime.strptime(valor, "%Y-%m-%d")
+    return valor
+
+def es_mayor_de_edad(user):
+    # Con el documento que ya trajo el login: una comparación, sin otra consulta
+    mayor_desde = user.get("mayor_desde")
+    if mayor_desde is None:
+        # Registro sin migrar (ver `flask --app app migrar-fechas`)
+        try:
+            fecha_nacimiento = leer_fecha_nacimiento(user.get("fecha_nacimiento"))
+        except ValueError:
+            fecha_nacimiento = None
+        if not fecha_nacimiento:
+            return False
+        mayor_desde = fecha_mayoria_edad(fecha_nacimiento)
+    return mayor_desde <= datetime.now()
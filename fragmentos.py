@@ -0,0 +1,81 @@
+from flask import current_app, make_response, request
+from markupsafe import Markup
+from werkzeug.http import is_resource_modified
+import glob
+import hashlib
+import json
+import os
+
+from assets import BASE, manifest
+from cache import FALTA, CacheLRU
+
+# ------------------ CACHÉ DE FRAGMENTOS RENDERIZADOS ------------------
+# Guarda HTML ya renderizado (la grilla de productos de inicio.html) por
+# página y bandera de edad. La versión del catálogo va en la clave, así que
+# un cambio en `productos` deja las entradas viejas sin uso hasta que el LRU
+# o el TTL las sacan. Cada app tiene la suya (app.extensions["six"]).
+def nueva_cache_fragmentos():
+    return CacheLRU(
+        max_entradas=int(os.environ.get("SIX_FRAGMENTOS_MAX", "500")),
+        ttl=float(os.environ.get("SIX_CACHE_TTL", "300"))
+    )
+
+def cache_fragmentos():
+    return current_app.extensions["six"]["fragmentos"]
+
+def clave_grilla(version, mayor_edad):
+    # Lo único que cambia la grilla: ruta (y categoría), cursor de página,
+    # versión del catálogo y si el usuario es mayor de edad
+    return (
+        "grilla",
+        version,
+        request.endpoint,
+        tuple(sorted((request.view_args or {}).items())),
+        request.args.get("despues"),
+        request.args.get("antes"),
+        bool(mayor_edad),
+    )
+
+def fragmento(clave, renderizar):
+    cache = cache_fragmentos()
+    html = cache.obtener(clave)
+    if html is FALTA:
+        html = renderizar()
+        cache.guardar(clave, html)
+    return Markup(html)
+
+# ------------------ GET CONDICIONAL (ETag / Last-Modified) ------------------
+_despliegue = {"huella": None}
+
+def huella_despliegue():
+    # Cambia si cambian las plantillas o los assets publicados, para que un
+    # deploy no responda 304 con HTML viejo
+    if _despliegue["huella"] is None:
+        h = hashlib.sha1(json.dumps(manifest(), sort_keys=True).encode("utf-8"))
+        for ruta in sorted(glob.glob(os.path.join(BASE, "templates", "*.html"))):
+            with open(ruta, "rb") as entrada:
+                h.update(entrada.read())
+        _despliegue["huella"] = h.hexdigest()
+    return _despliegue["huella"]
+
+def respuesta_condicional(partes, modificado, renderizar):
+    # `partes` es todo lo que determina el HTML (versión del catálogo,
+    # usuario, ruta...). Si el navegador ya tiene esa versión se responde
+    # 304 sin consultar ni renderizar nada.
+    etag = hashlib.sha1(repr((huella_despliegue(),) + tuple(partes)).encode("utf-8")).hexdigest()[:20]
+    if modificado is not None:
+        modificado = modificado.replace(microsecond=0)
+
+    if is_resource_modified(request.environ, etag=etag, last_modified=modificado):
+        respuesta = make_response(renderizar())
+    else:
+        respuesta = make_response("", 304)
+
+    if respuesta.status_code in (200, 304):
+        respuesta.set_etag(etag, weak=True)
+        if modificado is not None:
+            respuesta.last_modified = modificado
+        # La página lleva el nombre del usuario: solo la guarda el navegador
+        respuesta.headers["Cache-Control"] = "private, no-cache"
+        respuesta.vary.add("Cookie")
+    return respuesta
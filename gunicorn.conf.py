@@ -0,0 +1,41 @@
+# Configuración de gunicorn (ver Procfile.txt). gunicorn ya toma el puerto
+# de $PORT y el número de workers de $WEB_CONCURRENCY.
+import os
+
+timeout = int(os.environ.get("SIX_GUNICORN_TIMEOUT", "30"))
+graceful_timeout = timeout
+
+# Seguro con la conexión perezosa de conexion.py: cada worker crea su
+# propio MongoClient después del fork
+preload_app = os.environ.get("SIX_GUNICORN_PRELOAD", "0") == "1"
+
+# Modo de servicio, elegido al desplegar con SIX_MODO_SERVIDOR:
+#   sync    un request a la vez por worker (el de siempre)
+#   gthread varios hilos por worker; el estado compartido de la app
+#           (cachés, índice de búsqueda, carritos en memoria, contadores)
+#           está protegido con locks
+#   gevent  greenlets; gunicorn parchea threading/socket, así que pymongo y
+#           los mismos locks cooperan. Requiere `pip install gevent`
+modo_servidor = os.environ.get("SIX_MODO_SERVIDOR", "sync")
+if modo_servidor == "gthread":
+    worker_class = "gthread"
+    threads = int(os.environ.get("SIX_GUNICORN_THREADS", "8"))
+elif modo_servidor == "gevent":
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("SIX_GUNICORN_CONEXIONES", "200"))
+elif modo_servidor != "sync":
+    raise ValueError(f"SIX_MODO_SERVIDOR desconocido: {modo_servidor}")
+
+# Recicla workers de vez en cuando para acotar la memoria
+max_requests = int(os.environ.get("SIX_GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+def on_starting(server):
+    # Sin SECRET_KEY la app rechazaría cada petición: mejor no arrancar
+    from config import FALTA_CLAVE, desde_entorno
+    if not desde_entorno()["SECRET_KEY"]:
+        raise RuntimeError(FALTA_CLAVE)
+
+    # Publica los assets con huella una sola vez, antes de crear workers
+    from assets import construir
+    construir()
@@ -0,0 +1,112 @@
+from bson import ObjectId
+from datetime import datetime
+import os
+
+# ------------------ CONFIGURACIÓN ------------------
+ORDENES_POR_PAGINA = int(os.environ.get("SIX_ORDENES_POR_PAGINA", "20"))
+
+# Las órdenes pendientes (checkout a medias) no forman parte del historial
+_CONFIRMADAS = {"estado": {"$ne": "pendiente"}}
+
+# ------------------ PÁGINAS DEL HISTORIAL ------------------
+# Paginación por cursor sobre (fecha_compra, _id) en orden descendente, con
+# el índice {usuario, fecha_compra}. Solo viajan los campos de la lista; el
+# carrito de cada orden se pide aparte con detalle_orden().
+def _cursor(orden):
+    return f"{orden['fecha_compra'].isoformat()}~{orden['_id']}"
+
+def _leer_cursor(valor):
+    try:
+        fecha, orden_id = valor.split("~")
+        return datetime.fromisoformat(fecha), ObjectId(orden_id)
+    except (AttributeError, ValueError, TypeError):
+        return None
+
+def pagina_historial(pagos, usuario, antes=None, por_pagina=None):
+    por_pagina = por_pagina or ORDENES_POR_PAGINA
+    filtro = dict(_CONFIRMADAS, usuario=usuario)
+    cursor = _leer_cursor(antes)
+    if cursor:
+        fecha, orden_id = cursor
+        filtro["$or"] = [
+            {"fecha_compra": {"$lt": fecha}},
+            {"fecha_compra": fecha, "_id": {"$lt": orden_id}},
+        ]
+
+    ordenes = list(pagos.aggregate([
+        {"$match": filtro},
+        {"$sort": {"fecha_compra": -1, "_id": -1}},
+        {"$limit": por_pagina + 1},
+        {"$project": {
+            "numero_orden": 1,
+            "fecha_compra": 1,
+            "total": 1,
+            "articulos": {"$sum": "$carrito.cantidad"},
+        }},
+    ]))
+    siguiente = _cursor(ordenes[por_pagina - 1]) if len(ordenes) > por_pagina else None
+    return ordenes[:por_pagina], siguiente
+
+def detalle_orden(pagos, usuario, numero_orden):
+    return pagos.find_one(
+        dict(_CONFIRMADAS, usuario=usuario, numero_orden=numero_orden),
+        {"_id": 0, "numero_orden": 1, "carrito.name": 1, "carrito.price": 1, "carrito.cantidad": 1}
+    )
+
+# ------------------ RESUMEN POR USUARIO ------------------
+# resumenes/{_id: usuario}: ordenes, gastado, ultima_compra, ultimo_numero_orden.
+# Se actualiza en cada checkout, así que la cabecera del historial es una
+# lectura por _id en lugar de una agregación sobre todas las órdenes.
+def registrar_en_resumen(resumenes, pagos, orden):
+    if resumenes.find_one({"_id": orden["usuario"]}, {"_id": 1}) is None:
+        # Primera compra desde que existe el resumen: se parte de las
+        # anteriores (sin esta, que ya está confirmada y se suma abajo)
+        previas = list(pagos.aggregate(_agrupar_por_usuario(
+            {"usuario": orden["usuario"], "_id": {"$ne": orden["_id"]}}
+        )))
+        if previas:
+            base = {campo: valor for campo, valor in previas[0].items() if campo != "_id"}
+            resumenes.update_one({"_id": orden["usuario"]}, {"$setOnInsert": base}, upsert=True)
+    resumenes.update_one(
+        {"_id": orden["usuario"]},
+        {"$inc": {"ordenes": 1, "gastado": orden["total"]},
+         "$max": {"ultima_compra": orden["fecha_compra"]},
+         "$set": {"ultimo_numero_orden": orden["numero_orden"]}},
+        upsert=True
+    )
+
+def _agrupar_por_usuario(filtro):
+    return [
+        {"$match": dict(_CONFIRMADAS, **filtro)},
+        {"$sort": {"fecha_compra": 1}},
+        {"$group": {
+            "_id": "$usuario",
+            "ordenes": {"$sum": 1},
+            "gastado": {"$sum": "$total"},
+            "ultima_compra": {"$last": "$fecha_compra"},
+            "ultimo_numero_orden": {"$last": "$numero_orden"},
+        }},
+    ]
+
+def obtener_resumen(resumenes, pagos, usuario):
+    resumen = resumenes.find_one({"_id": usuario})
+    if resumen is None:
+        # Usuario con compras anteriores al resumen: se calcula una sola vez
+        # Solo si sigue sin existir: un checkout que corrió entretanto ya lo
+        # creó con su $inc y reemplazarlo borraría esa orden del resumen
+        calculado = list(pagos.aggregate(_agrupar_por_usuario({"usuario": usuario})))
+        base = calculado[0] if calculado else {"ordenes": 0, "gastado": 0}
+        resumenes.update_one(
+            {"_id": usuario},
+            {"$setOnInsert": {campo: valor for campo, valor in base.items() if campo != "_id"}},
+            upsert=True
+        )
+        resumen = resumenes.find_one({"_id": usuario})
+    return resumen
+
+def reconstruir_resumenes(resumenes, pagos):
+    total = 0
+    for resumen in pagos.aggregate(_agrupar_por_usuario({}), allowDiskUse=True):
+        resumenes.replace_one({"_id": resumen["_id"]}, resumen, upsert=True)
+        total += 1
+    return total
@@ -0,0 +1,126 @@
+from concurrent.futures import ProcessPoolExecutor
+from flask import abort, send_from_directory, url_for
+from pymongo import UpdateOne
+from urllib.request import Request, urlopen
+import hashlib
+import io
+import os
+
+from assets import CACHE_INMUTABLE
+from catalogo import marcar_cambio
+from metricas import log
+
+# ------------------ CONFIGURACIÓN ------------------
+BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flask_mongo_crud_alumnos")
+DIR_MINIATURAS = os.path.join(BASE, "static", "miniaturas")
+ANCHOS = tuple(int(a) for a in os.environ.get("SIX_ANCHOS_MINIATURA", "160,320,640").split(","))
+CALIDAD_WEBP = int(os.environ.get("SIX_CALIDAD_WEBP", "80"))
+TIMEOUT_DESCARGA = float(os.environ.get("SIX_TIMEOUT_DESCARGA", "15"))
+
+# ------------------ GENERACIÓN ------------------
+def _leer_origen(origen):
+    if origen.startswith(("http://", "https://")):
+        peticion = Request(origen, headers={"User-Agent": "six-miniaturas"})
+        with urlopen(peticion, timeout=TIMEOUT_DESCARGA) as respuesta:
+            return respuesta.read()
+    with open(origen, "rb") as entrada:
+        return entrada.read()
+
+def generar_miniaturas(origen):
+    # Descarga (o lee) la imagen una vez y guarda una WebP por ancho con el
+    # nombre <sha256 del original>-<ancho>.webp. Si ya existen no se vuelven
+    # a generar. Devuelve {ancho: nombre} con claves str para Mongo.
+    from PIL import Image
+
+    datos = _leer_origen(origen)
+    huella = hashlib.sha256(datos).hexdigest()[:16]
+    os.makedirs(DIR_MINIATURAS, exist_ok=True)
+
+    miniaturas = {}
+    imagen = None
+    for ancho in ANCHOS:
+        nombre = f"{huella}-{ancho}.webp"
+        ruta = os.path.join(DIR_MINIATURAS, nombre)
+        if not os.path.exists(ruta):
+            if imagen is None:
+                imagen = Image.open(io.BytesIO(datos))
+                imagen = imagen.convert("RGBA" if "A" in imagen.getbands() else "RGB")
+            copia = imagen.copy()
+            # thumbnail() nunca agranda: una imagen chica se queda en su tamaño
+            copia.thumbnail((ancho, ancho * 4))
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            copia.save(temporal, "WEBP", quality=CALIDAD_WEBP, method=6)
+            os.replace(temporal, ruta)
+        miniaturas[str(ancho)] = nombre
+    return miniaturas
+
+def _generar_seguro(origen):
+    try:
+        return origen, generar_miniaturas(origen), None
+    except Exception as e:
+        return origen, None, f"{type(e).__name__}: {e}"
+
+# ------------------ BACKFILL DEL CATÁLOGO ------------------
+def backfill(productos, procesos=None, lote=500, rehacer=False):
+    # Procesa el catálogo en lotes; dentro de cada lote las imágenes se
+    # reparten en un pool de procesos (Pillow usa CPU, no I/O)
+    filtro = {"img": {"$exists": True, "$ne": ""}}
+    if not rehacer:
+        filtro["miniaturas"] = {"$exists": False}
+
+    procesados = fallidos = 0
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        cursor = productos.find(filtro, {"img": 1})
+        while True:
+            pendientes = {}
+            for producto in cursor:
+                pendientes.setdefault(producto["img"], []).append(producto["_id"])
+                if len(pendientes) >= lote:
+                    break
+            if not pendientes:
+                break
+
+            operaciones = []
+            for origen, miniaturas, error in pool.map(_generar_seguro, list(pendientes)):
+                if error:
+                    fallidos += len(pendientes[origen])
+                    log.warning("No se pudo generar miniaturas de %s: %s", origen, error)
+                    continue
+                for producto_id in pendientes[origen]:
+                    operaciones.append(UpdateOne({"_id": producto_id}, {"$set": {"miniaturas": miniaturas}}))
+            if operaciones:
+                procesados += productos.bulk_write(operaciones, ordered=False).modified_count
+
+    if procesados:
+        marcar_cambio(productos)
+    return procesados, fallidos
+
+# ------------------ USO DESDE FLASK ------------------
+def _ordenadas(producto):
+    miniaturas = producto.get("miniaturas") or {}
+    return sorted((int(ancho), nombre) for ancho, nombre in miniaturas.items())
+
+def srcset(producto):
+    # En plantillas: srcset="{{ srcset(producto) }}". Vacío si el producto
+    # aún no tiene miniaturas; entonces solo cuenta el src con `img`.
+    return ", ".join(
+        f"{url_for('estado.servir_miniatura', nombre=nombre)} {ancho}w"
+        for ancho, nombre in _ordenadas(producto)
+    )
+
+def miniatura(producto, ancho):
+    # La miniatura más chica que cubre `ancho` (o la más grande que haya);
+    # sin miniaturas se usa la imagen original
+    ordenadas = _ordenadas(producto)
+    if not ordenadas:
+        return producto.get("img", "")
+    nombre = next((n for a, n in ordenadas if a >= ancho), ordenadas[-1][1])
+    return url_for("estado.servir_miniatura", nombre=nombre)
+
+def respuesta_miniatura(nombre):
+    # El nombre lleva la huella del original: nunca cambia de contenido
+    if not nombre.endswith(".webp"):
+        abort(404)
+    respuesta = send_from_directory(DIR_MINIATURAS, nombre, mimetype="image/webp")
+    respuesta.headers["Cache-Control"] = CACHE_INMUTABLE
+    return respuesta
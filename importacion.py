@@ -0,0 +1,262 @@
+from bson import ObjectId
+from decimal import Decimal, InvalidOperation
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+import csv
+import gzip
+import json
+import random
+import time
+
+from catalogo import marcar_cambio
+from restricciones import marcar_restringido
+
+# ------------------ FORMATO DEL CATÁLOGO ------------------
+# Columnas del CSV (y claves del JSONL). Cada fila se identifica por `_id`
+# (lo que escribe exportar) o, si no trae, por `sku`.
+COLUMNAS = [
+    "_id", "sku", "name", "brand", "category", "price", "oldPrice", "stock",
+    "img", "images", "description", "details", "rating",
+]
+# En CSV las listas van en una sola celda separadas por "|"
+LISTAS = ("images", "details")
+SEPARADOR_LISTA = "|"
+
+class FilaInvalida(ValueError):
+    pass
+
+# ------------------ LECTURA / ESCRITURA EN STREAMING ------------------
+def _formato(ruta, formato=None):
+    if formato:
+        return formato
+    nombre = ruta[:-3] if ruta.endswith(".gz") else ruta
+    return "csv" if nombre.endswith(".csv") else "jsonl"
+
+def _abrir(ruta, modo):
+    if ruta.endswith(".gz"):
+        return gzip.open(ruta, modo + "t", encoding="utf-8", newline="")
+    return open(ruta, modo, encoding="utf-8", newline="")
+
+def leer_filas(ruta, formato=None):
+    # Generador: una fila a la vez, la memoria no depende del tamaño del archivo
+    formato = _formato(ruta, formato)
+    with _abrir(ruta, "r") as entrada:
+        if formato == "csv":
+            for numero, fila in enumerate(csv.DictReader(entrada), start=2):
+                yield numero, fila
+        else:
+            for numero, linea in enumerate(entrada, start=1):
+                if linea.strip():
+                    try:
+                        fila = json.loads(linea)
+                    except ValueError as e:
+                        yield numero, FilaInvalida(f"JSON inválido: {e}")
+                        continue
+                    if not isinstance(fila, dict):
+                        yield numero, FilaInvalida(f"se esperaba un objeto JSON, no {type(fila).__name__}")
+                        continue
+                    yield numero, fila
+
+# ------------------ VALIDACIÓN Y NORMALIZACIÓN ------------------
+def _texto(valor):
+    return " ".join(str(valor).split()) if valor is not None else ""
+
+def _precio(valor, campo):
+    try:
+        precio = Decimal(str(valor).replace("$", "").replace(",", "").strip())
+    except InvalidOperation:
+        raise FilaInvalida(f"{campo} no es un número: {valor!r}")
+    if not precio.is_finite() or precio < 0:
+        raise FilaInvalida(f"{campo} fuera de rango: {valor!r}")
+    try:
+        # Con "1e30" el resultado no cabe en la precisión del contexto
+        precio = precio.quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise FilaInvalida(f"{campo} fuera de rango: {valor!r}")
+    # Los precios enteros se guardan como int, igual que el catálogo actual
+    return int(precio) if precio == precio.to_integral_value() else float(precio)
+
+def _lista(valor):
+    if isinstance(valor, list):
+        return [_texto(v) for v in valor if _texto(v)]
+    return [_texto(v) for v in str(valor or "").split(SEPARADOR_LISTA) if _texto(v)]
+
+def normalizar_categoria(categoria):
+    # "  Refrescos " -> "refrescos": las rutas /categoria/<category> usan minúsculas
+    return _texto(categoria).lower()
+
+def normalizar_producto(fila):
+    producto = {}
+    for campo in ("sku", "name", "brand", "img", "description"):
+        if _texto(fila.get(campo)):
+            producto[campo] = _texto(fila.get(campo))
+    if "name" not in producto:
+        raise FilaInvalida("falta name")
+
+    producto["category"] = normalizar_categoria(fila.get("category"))
+    if not producto["category"]:
+        raise FilaInvalida("falta category")
+
+    if fila.get("price") in (None, ""):
+        raise FilaInvalida("falta price")
+    producto["price"] = _precio(fila["price"], "price")
+    producto["oldPrice"] = (
+        _precio(fila["oldPrice"], "oldPrice") if fila.get("oldPrice") not in (None, "") else producto["price"]
+    )
+
+    if fila.get("stock") not in (None, ""):
+        try:
+            producto["stock"] = int(fila["stock"])
+        except (TypeError, ValueError):
+            raise FilaInvalida(f"stock no es entero: {fila['stock']!r}")
+    if fila.get("rating") not in (None, ""):
+        try:
+            producto["rating"] = float(fila["rating"])
+        except (TypeError, ValueError):
+            raise FilaInvalida(f"rating no es un número: {fila['rating']!r}")
+    for campo in LISTAS:
+        if fila.get(campo):
+            producto[campo] = _lista(fila[campo])
+
+    return marcar_restringido(producto)
+
+def _filtro(fila, producto):
+    producto_id = _texto(fila.get("_id"))
+    if producto_id:
+        if not ObjectId.is_valid(producto_id):
+            raise FilaInvalida(f"_id inválido: {producto_id!r}")
+        return {"_id": ObjectId(producto_id)}
+    if "sku" in producto:
+        return {"sku": producto["sku"]}
+    raise FilaInvalida("falta _id o sku")
+
+# ------------------ IMPORTACIÓN ------------------
+def _imagenes_guardadas(coleccion, filtros):
+    # img actual de los productos del lote que ya tienen miniaturas,
+    # indexada igual que los filtros: ("_id", valor) o ("sku", valor)
+    guardadas = {}
+    for campo in ("_id", "sku"):
+        valores = [filtro[campo] for filtro in filtros if campo in filtro]
+        if valores:
+            for producto in coleccion.find({campo: {"$in": valores}, "miniaturas": {"$exists": True}},
+                                           {"sku": 1, "img": 1}):
+                guardadas[(campo, producto.get(campo))] = producto.get("img")
+    return guardadas
+
+def _registrar_error(estadisticas, numero, mensaje):
+    estadisticas["invalidas"] += 1
+    if len(estadisticas["errores"]) < 100:
+        estadisticas["errores"].append((numero, mensaje))
+
+def importar(coleccion, filas, lote=1000, al_avanzar=None):
+    # filas: iterable de (número, dict) como lo da leer_filas(). Upserts en
+    # lotes con bulk_write desordenado; las filas inválidas (también las que
+    # el servidor rechaza, p. ej. un sku repetido) se reportan y se saltan
+    # sin detener la carga.
+    estadisticas = {"leidas": 0, "insertadas": 0, "actualizadas": 0, "invalidas": 0, "errores": []}
+    inicio = time.perf_counter()
+    pendientes = []
+
+    def escribir():
+        guardadas = _imagenes_guardadas(coleccion, [filtro for _, filtro, _ in pendientes])
+        operaciones = []
+        for _, filtro, producto in pendientes:
+            actualizacion = {"$set": producto}
+            # generar-miniaturas solo rehace productos sin miniaturas: si la
+            # imagen cambió, las de la imagen anterior se descartan
+            anterior = guardadas.get(next(iter(filtro.items())), producto.get("img"))
+            if "img" in producto and anterior != producto["img"]:
+                actualizacion["$unset"] = {"miniaturas": ""}
+            operaciones.append(UpdateOne(filtro, actualizacion, upsert=True))
+        try:
+            resultado = coleccion.bulk_write(operaciones, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            resultado = e.details
+            for error in resultado["writeErrors"]:
+                _registrar_error(estadisticas, pendientes[error["index"]][0], error["errmsg"])
+        estadisticas["insertadas"] += resultado["nUpserted"]
+        estadisticas["actualizadas"] += resultado["nModified"]
+        pendientes.clear()
+        if al_avanzar:
+            al_avanzar(estadisticas, time.perf_counter() - inicio)
+
+    for numero, fila in filas:
+        estadisticas["leidas"] += 1
+        try:
+            if isinstance(fila, Exception):
+                raise fila
+            producto = normalizar_producto(fila)
+            pendientes.append((numero, _filtro(fila, producto), producto))
+        except FilaInvalida as e:
+            _registrar_error(estadisticas, numero, str(e))
+            continue
+        if len(pendientes) >= lote:
+            escribir()
+    if pendientes:
+        escribir()
+
+    if estadisticas["insertadas"] or estadisticas["actualizadas"]:
+        marcar_cambio(coleccion)
+    estadisticas["segundos"] = time.perf_counter() - inicio
+    return estadisticas
+
+# ------------------ EXPORTACIÓN ------------------
+def _celda(valor):
+    if isinstance(valor, list):
+        return SEPARADOR_LISTA.join(str(v) for v in valor)
+    return "" if valor is None else str(valor)
+
+def exportar(coleccion, ruta, formato=None, filtro=None):
+    # Recorre `productos` por _id en lotes del cursor; escribe fila por fila
+    formato = _formato(ruta, formato)
+    proyeccion = {campo: 1 for campo in COLUMNAS}
+    escritas = 0
+    with _abrir(ruta, "w") as salida:
+        if formato == "csv":
+            escritor = csv.DictWriter(salida, fieldnames=COLUMNAS, extrasaction="ignore")
+            escritor.writeheader()
+        for producto in coleccion.find(filtro or {}, proyeccion).sort("_id", 1).batch_size(1000):
+            producto["_id"] = str(producto["_id"])
+            if formato == "csv":
+                escritor.writerow({campo: _celda(producto.get(campo)) for campo in COLUMNAS})
+            else:
+                salida.write(json.dumps(producto, ensure_ascii=False, default=str) + "\n")
+            escritas += 1
+    return escritas
+
+# ------------------ CATÁLOGO SINTÉTICO ------------------
+# Mismo formato que un archivo real: sirve para los benchmarks
+# (bench/_comun.py) y para `flask --app app generar-catalogo`.
+CATEGORIAS = ["alcohol", "refrescos", "sabritas", "cigarros", "dulces", "lacteos", "limpieza"]
+MARCAS = ["Sabritas", "Coca-Cola", "Modelo", "Marlboro", "Bimbo", "Lala", "Great Value"]
+
+def productos_sinteticos(n, semilla=42):
+    rnd = random.Random(semilla)
+    for i in range(n):
+        precio = rnd.randint(10, 500)
+        categoria = rnd.choice(CATEGORIAS)
+        yield {
+            "sku": f"SIN-{i:08d}",
+            "name": f"Producto {categoria} {i}",
+            "brand": rnd.choice(MARCAS),
+            "category": categoria,
+            "price": precio,
+            "oldPrice": precio + rnd.randint(0, 50),
+            "img": f"https://via.placeholder.com/300?text={i}",
+            "description": "Descripción de ejemplo " * 20,
+            "details": [f"Detalle {j}" for j in range(5)],
+            "rating": rnd.randint(1, 10) / 2,
+        }
+
+def generar(ruta, n, formato=None, semilla=42):
+    formato = _formato(ruta, formato)
+    with _abrir(ruta, "w") as salida:
+        if formato == "csv":
+            escritor = csv.DictWriter(salida, fieldnames=COLUMNAS, extrasaction="ignore")
+            escritor.writeheader()
+        for producto in productos_sinteticos(n, semilla):
+            if formato == "csv":
+                escritor.writerow({campo: _celda(producto.get(campo)) for campo in COLUMNAS})
+            else:
+                salida.write(json.dumps(producto, ensure_ascii=False) + "\n")
+    return n
@@ -0,0 +1,152 @@
+from bson import ObjectId
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+import threading
+
+from conexion import por_base, resolver
+from historial import ORDENES_POR_PAGINA
+from metricas import log
+
+# ------------------ ÍNDICES DECLARADOS ------------------
+# colección -> [(llaves, opciones)]
+INDICES = {
+    "usuarios": [
+        ([("usuario", ASCENDING)], {"name": "usuario_unico", "unique": True}),
+    ],
+    "pagos": [
+        ([("usuario", ASCENDING), ("fecha_compra", DESCENDING)], {"name": "usuario_fecha"}),
+        ([("numero_orden", ASCENDING)], {"name": "numero_orden_unico", "unique": True, "sparse": True}),
+        ([("clave_idempotencia", ASCENDING)], {"name": "clave_idempotencia_unica", "unique": True, "sparse": True}),
+        # Solo las órdenes a medio checkout, para liberar_pendientes()
+        ([("estado", ASCENDING), ("_id", ASCENDING)],
+         {"name": "pendientes", "partialFilterExpression": {"estado": "pendiente"}}),
+    ],
+    "productos": [
+        # category + _id sirve al filtro y al orden de la paginación por cursor
+        ([("category", ASCENDING), ("_id", ASCENDING)], {"name": "categoria_id"}),
+        # Llave de los upserts de importar-catalogo cuando la fila no trae _id
+        ([("sku", ASCENDING)], {"name": "sku_unico", "unique": True, "sparse": True}),
+    ],
+    "ventas_productos": [
+        # Más vendidos del tablero de analítica
+        ([("unidades", DESCENDING)], {"name": "unidades"}),
+    ],
+    "carritos": [
+        # Los carritos abandonados se borran solos a los 30 días
+        ([("actualizado", ASCENDING)], {"name": "carrito_expira", "expireAfterSeconds": 30 * 24 * 3600}),
+    ],
+}
+
+def crear_indices(db):
+    # Cada índice por separado: si uno falla (p. ej. números de orden
+    # repetidos de antes de numero_orden_unico) los demás se crean igual.
+    # Devuelve [(colección, índice, error)], con error None si se creó. Los
+    # errores de conexión sí cortan: no tiene caso intentar los demás.
+    resultados = []
+    for nombre, indices in INDICES.items():
+        for llaves, opciones in indices:
+            try:
+                db[nombre].create_index(llaves, **opciones)
+                error = None
+            except OperationFailure as e:
+                error = e
+            resultados.append((nombre, opciones["name"], error))
+    return resultados
+
+def crear_indice(destino, coleccion, nombre):
+    # Crea en la colección `destino` el índice `nombre` que INDICES define
+    # para `coleccion`; destino puede llamarse distinto (p. ej. bench.checkout
+    # usa "pagos_checkout")
+    llaves, opciones = next((llaves, opciones) for llaves, opciones in INDICES[coleccion]
+                            if opciones["name"] == nombre)
+    return destino.create_index(llaves, **opciones)
+
+_lock = threading.Lock()
+
+def _crear_en_segundo_plano(db):
+    try:
+        resultados = crear_indices(db)
+    except Exception as e:
+        log.error("No se pudieron crear los índices de MongoDB: %s", e)
+        return
+    fallidos = [(coleccion, indice, error) for coleccion, indice, error in resultados if error]
+    for coleccion, indice, error in fallidos:
+        log.error("No se pudo crear el índice %s.%s: %s", coleccion, indice, error)
+    if not fallidos:
+        log.info("Índices de MongoDB verificados")
+
+def asegurar_indices(db):
+    # Una vez por proceso y base, en la primera petición y en un hilo aparte:
+    # ni importar la app ni atender esa petición esperan a Mongo. Si falla se
+    # registra y no se reintenta (para eso está `flask --app app crear-indices`).
+    asegurados = por_base(db, "indices", dict)
+    if asegurados:
+        return
+    with _lock:
+        if asegurados:
+            return
+        asegurados["lanzado"] = True
+    threading.Thread(target=_crear_en_segundo_plano, args=(resolver(db),), daemon=True).start()
+
+# ------------------ VERIFICACIÓN DE PLANES ------------------
+# Cada consulta que hace la app, con valores de ejemplo. La construcción del
+# índice de búsqueda recorre `productos` completo a propósito y no está aquí.
+_ID = ObjectId()
+_FECHA = datetime(2024, 1, 1)
+
+CONSULTAS = {
+    "login / registro / recuperar": lambda db: db["usuarios"].find({"usuario": "ejemplo"}).limit(1),
+    "inicio / categoria todo": lambda db: db["productos"].find({}).sort("_id", 1).limit(25),
+    "categoria": lambda db: db["productos"].find({"category": "alcohol"}).sort("_id", 1).limit(25),
+    "categoria (anterior)": lambda db: db["productos"].find(
+        {"category": "alcohol", "_id": {"$lt": _ID}}).sort("_id", -1).limit(25),
+    "producto por id": lambda db: db["productos"].find({"_id": _ID}).limit(1),
+    "carrito / busqueda ($in)": lambda db: db["productos"].find({"_id": {"$in": [_ID]}}),
+    "carrito del servidor": lambda db: db["carritos"].find({"_id": "ejemplo"}).limit(1),
+    # pagina_historial es un aggregate que empieza con $match + $sort +
+    # $limit; Mongo planifica ese prefijo igual que este find
+    "historial": lambda db: db["pagos"].find(
+        {"usuario": "ejemplo", "estado": {"$ne": "pendiente"}}
+    ).sort([("fecha_compra", -1), ("_id", -1)]).limit(ORDENES_POR_PAGINA + 1),
+    "historial (página siguiente)": lambda db: db["pagos"].find(
+        {"usuario": "ejemplo", "estado": {"$ne": "pendiente"},
+         "$or": [{"fecha_compra": {"$lt": _FECHA}}, {"fecha_compra": _FECHA, "_id": {"$lt": _ID}}]}
+    ).sort([("fecha_compra", -1), ("_id", -1)]).limit(ORDENES_POR_PAGINA + 1),
+    "pago_exitoso": lambda db: db["pagos"].find(
+        {"usuario": "ejemplo", "estado": {"$ne": "pendiente"}}).sort("fecha_compra", -1).limit(1),
+    "historial (detalle)": lambda db: db["pagos"].find(
+        {"usuario": "ejemplo", "numero_orden": "ejemplo", "estado": {"$ne": "pendiente"}}).limit(1),
+    "resumen de compras": lambda db: db["resumenes"].find({"_id": "ejemplo"}).limit(1),
+    "pago (idempotencia)": lambda db: db["pagos"].find(
+        {"usuario": "ejemplo", "clave_idempotencia": "ejemplo"}).limit(1),
+    "liberar-pendientes": lambda db: db["pagos"].find({"estado": "pendiente", "_id": {"$lt": _ID}}),
+    "pago (stock)": lambda db: db["productos"].find({"_id": _ID, "stock": {"$gte": 1}}).limit(1),
+    "importar-catalogo (upsert por sku)": lambda db: db["productos"].find({"sku": "ejemplo"}).limit(1),
+    "analitica (órdenes nuevas)": lambda db: db["pagos"].find(
+        {"estado": {"$ne": "pendiente"}, "_id": {"$gt": _ID, "$lt": _ID}}).sort("_id", 1).limit(1000),
+    "analitica (ventas por día)": lambda db: db["ventas_dias"].find({"_id": {"$gte": "2024-01-01"}}).sort("_id", 1),
+    "analitica (categorías por día)": lambda db: db["ventas_categorias"].find(
+        {"_id": {"$gte": "2024-01-01"}}).sort("_id", 1),
+    "analitica (más vendidos)": lambda db: db["ventas_productos"].find({}).sort("unidades", -1).limit(10),
+}
+
+def _etapas(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for valor in plan.values():
+            yield from _etapas(valor)
+    elif isinstance(plan, list):
+        for valor in plan:
+            yield from _etapas(valor)
+
+def verificar_planes(db):
+    # Devuelve [(consulta, etapas, ok)]; ok es False si el plan ganador
+    # termina en un COLLSCAN
+    resultados = []
+    for nombre, consulta in CONSULTAS.items():
+        plan = consulta(db).explain().get("queryPlanner", {}).get("winningPlan", {})
+        etapas = list(_etapas(plan))
+        resultados.append((nombre, etapas, "COLLSCAN" not in etapas))
+    return resultados
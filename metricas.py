@@ -0,0 +1,210 @@
+from bisect import bisect_left
+from flask import g, has_request_context, request
+from pymongo.monitoring import CommandListener
+import logging
+import os
+import threading
+import time
+
+# ------------------ LOGGING ------------------
+# Un solo logger con nivel configurable (SIX_LOG_LEVEL=DEBUG|INFO|WARNING...).
+# Los mensajes de depuración no cuestan nada con el nivel por defecto.
+log = logging.getLogger("six")
+
+def configurar_logging():
+    logging.basicConfig(
+        level=os.environ.get("SIX_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s",
+    )
+
+# ------------------ UMBRALES ------------------
+PETICION_LENTA_MS = float(os.environ.get("SIX_PETICION_LENTA_MS", "500"))
+CONSULTA_LENTA_MS = float(os.environ.get("SIX_CONSULTA_LENTA_MS", "100"))
+SERVER_TIMING = os.environ.get("SIX_SERVER_TIMING", "1") == "1"
+
+# ------------------ HISTOGRAMAS ------------------
+class Histograma:
+    # Conteos por cubeta al estilo Prometheus (le = "menor o igual que"),
+    # una serie por combinación de etiquetas
+    def __init__(self, nombre, ayuda, etiquetas, limites):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(limites)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valores, segundos):
+        cubeta = bisect_left(self.limites, segundos)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][cubeta] += 1
+            serie[1] += segundos
+
+    def series(self):
+        with self._lock:
+            return [(valores, list(conteos), suma) for valores, (conteos, suma) in self._series.items()]
+
+class Contador:
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, valores, cantidad=1):
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + cantidad
+
+    def series(self):
+        with self._lock:
+            return list(self._series.items())
+
+LIMITES_PETICION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_MONGO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+peticiones = Histograma(
+    "six_peticion_duracion_segundos", "Duración de las peticiones HTTP por ruta",
+    ("ruta", "metodo", "estado"), LIMITES_PETICION
+)
+comandos_mongo = Histograma(
+    "six_mongo_comando_duracion_segundos", "Duración de los comandos de MongoDB",
+    ("coleccion", "comando"), LIMITES_MONGO
+)
+comandos_fallidos = Contador(
+    "six_mongo_comandos_fallidos_total", "Comandos de MongoDB que terminaron en error",
+    ("coleccion", "comando")
+)
+consultas_lentas = Contador(
+    "six_mongo_consultas_lentas_total", f"Comandos de MongoDB de más de {CONSULTA_LENTA_MS:g} ms",
+    ("coleccion", "comando")
+)
+
+# ------------------ COMANDOS DE MONGODB ------------------
+# Comandos internos del driver que no dicen nada de la app
+_IGNORADOS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+def _forma(valor):
+    # {"usuario": "ana", "fecha": {"$lt": ...}} -> {"usuario": "?", "fecha": {"$lt": "?"}}
+    # para registrar la forma de la consulta sin datos de usuarios
+    if isinstance(valor, dict):
+        return {clave: _forma(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_forma(valor[0])] if valor else []
+    return "?"
+
+class MonitorComandos(CommandListener):
+    def __init__(self):
+        self._pendientes = {}
+
+    def started(self, event):
+        if event.command_name in _IGNORADOS:
+            return
+        coleccion = event.command.get(event.command_name)
+        if not isinstance(coleccion, str):
+            # getMore lleva el id del cursor; la colección va aparte
+            coleccion = event.command.get("collection", "")
+        consulta = event.command.get("filter", event.command.get("q"))
+        self._pendientes[(event.connection_id, event.request_id)] = (coleccion, consulta)
+
+    def succeeded(self, event):
+        self._terminar(event, fallo=False)
+
+    def failed(self, event):
+        self._terminar(event, fallo=True)
+
+    def _terminar(self, event, fallo):
+        pendiente = self._pendientes.pop((event.connection_id, event.request_id), None)
+        if pendiente is None:
+            return
+        coleccion, consulta = pendiente
+        segundos = event.duration_micros / 1e6
+        etiquetas = (coleccion, event.command_name)
+        comandos_mongo.observar(etiquetas, segundos)
+        if fallo:
+            comandos_fallidos.sumar(etiquetas)
+        if segundos * 1000 >= CONSULTA_LENTA_MS:
+            consultas_lentas.sumar(etiquetas)
+            log.warning("Consulta lenta %.1f ms: %s.%s filtro=%s",
+                        segundos * 1000, coleccion, event.command_name,
+                        _forma(consulta) if consulta is not None else "-")
+        # Los eventos llegan en el hilo (o greenlet) que hizo la consulta
+        if has_request_context() and "mongo_consultas" in g:
+            g.mongo_consultas += 1
+            g.mongo_segundos += segundos
+
+monitor_comandos = MonitorComandos()
+
+# ------------------ PETICIONES HTTP ------------------
+def instrumentar(app):
+    @app.before_request
+    def _iniciar_medicion():
+        g.inicio_peticion = time.perf_counter()
+        g.mongo_consultas = 0
+        g.mongo_segundos = 0.0
+
+    @app.after_request
+    def _registrar_medicion(respuesta):
+        inicio = g.pop("inicio_peticion", None)
+        if inicio is None:
+            return respuesta
+        segundos = time.perf_counter() - inicio
+        # La regla (/producto/<producto_id>) y no la URL: pocas series
+        ruta = request.url_rule.rule if request.url_rule else "sin_ruta"
+        peticiones.observar((ruta, request.method, str(respuesta.status_code)), segundos)
+
+        if SERVER_TIMING:
+            respuesta.headers["Server-Timing"] = (
+                f"app;dur={segundos * 1000:.1f}, "
+                f'mongo;dur={g.mongo_segundos * 1000:.1f};desc="{g.mongo_consultas} consultas"'
+            )
+        if segundos * 1000 >= PETICION_LENTA_MS:
+            log.warning("Petición lenta %.1f ms: %s %s -> %s (%d consultas, %.1f ms en Mongo)",
+                        segundos * 1000, request.method, ruta, respuesta.status_code,
+                        g.mongo_consultas, g.mongo_segundos * 1000)
+        return respuesta
+
+# ------------------ FORMATO DE TEXTO DE PROMETHEUS ------------------
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _etiquetas(nombres, valores, extra=()):
+    pares = list(zip(nombres, valores)) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares) + "}"
+
+def texto_prometheus(indicadores=()):
+    # Métricas de este proceso. Con varios workers de gunicorn cada uno
+    # lleva las suyas; la etiqueta `pid` las distingue.
+    # indicadores: [(nombre, tipo, ayuda, {etiquetas...}, valor)] que aporta
+    # la app desde sus propias estadísticas: caché, pool de conexiones...
+    lineas = []
+    pid = (("pid", os.getpid()),)
+    for histograma in (peticiones, comandos_mongo):
+        lineas.append(f"# HELP {histograma.nombre} {histograma.ayuda}")
+        lineas.append(f"# TYPE {histograma.nombre} histogram")
+        for valores, conteos, suma in histograma.series():
+            acumulado = 0
+            for limite, conteo in zip(histograma.limites + ("+Inf",), conteos):
+                acumulado += conteo
+                le = (("le", limite if limite == "+Inf" else f"{limite:g}"),)
+                lineas.append(f"{histograma.nombre}_bucket{_etiquetas(histograma.etiquetas, valores, pid + le)} {acumulado}")
+            lineas.append(f"{histograma.nombre}_sum{_etiquetas(histograma.etiquetas, valores, pid)} {suma:.6f}")
+            lineas.append(f"{histograma.nombre}_count{_etiquetas(histograma.etiquetas, valores, pid)} {acumulado}")
+    for contador in (comandos_fallidos, consultas_lentas):
+        lineas.append(f"# HELP {contador.nombre} {contador.ayuda}")
+        lineas.append(f"# TYPE {contador.nombre} counter")
+        for valores, total in contador.series():
+            lineas.append(f"{contador.nombre}{_etiquetas(contador.etiquetas, valores, pid)} {total}")
+    # Las muestras de una misma métrica deben ir juntas bajo su HELP/TYPE
+    familias = {}
+    for nombre, tipo, ayuda, etiquetas, valor in indicadores:
+        familia = familias.setdefault(nombre, [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"])
+        familia.append(f"{nombre}{_etiquetas(etiquetas.keys(), etiquetas.values(), pid)} {valor}")
+    for familia in familias.values():
+        lineas.extend(familia)
+    return "\n".join(lineas) + "\n"
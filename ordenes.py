@@ -0,0 +1,41 @@
+from pymongo import ReturnDocument
+import os
+import threading
+
+# ------------------ NÚMEROS DE ORDEN ------------------
+# Cada proceso reserva un rango de números con un solo $inc atómico sobre
+# meta/ordenes y los reparte desde memoria. Dos procesos nunca comparten
+# rango, así que no hay colisiones, y dentro de un proceso los números
+# salen en orden creciente.
+LOTE_ORDENES = int(os.environ.get("SIX_LOTE_ORDENES", "1000"))
+
+class GeneradorOrdenes:
+    def __init__(self, coleccion_meta, lote=LOTE_ORDENES, prefijo="SIX-"):
+        self.coleccion_meta = coleccion_meta
+        self.lote = lote
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self._pid = None
+        self._siguiente = 0
+        self._limite = 0
+
+    def _reservar(self):
+        doc = self.coleccion_meta.find_one_and_update(
+            {"_id": "ordenes"},
+            {"$inc": {"valor": self.lote}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._limite = doc["valor"]
+        self._siguiente = self._limite - self.lote + 1
+
+    def siguiente(self):
+        with self._lock:
+            # Tras un fork el hijo no puede seguir con el rango del padre
+            if self._pid != os.getpid() or self._siguiente > self._limite:
+                self._reservar()
+                self._pid = os.getpid()
+            numero = self._siguiente
+            self._siguiente += 1
+        # Ancho fijo para que el orden alfabético sea el numérico
+        return f"{self.prefijo}{numero:012d}"
@@ -0,0 +1,65 @@
+from functools import lru_cache
+from pymongo import UpdateOne
+import os
+import re
+
+from busqueda import normalizar
+from catalogo import marcar_cambio
+
+# ------------------ POLÍTICA DE PRODUCTOS RESTRINGIDOS (+18) ------------------
+# Raíces que, dentro de la categoría, marcan un producto como restringido.
+# Se buscan como subcadena, así que conviene la raíz y no la palabra:
+# "tabac" + "tabaq" cubren tabaco, tabacalera y tabaquería; "cigarr" cubre
+# cigarro, cigarros y cigarrillos.
+# Se configuran con SIX_PALABRAS_RESTRINGIDAS="alcohol,cigarr,...".
+PALABRAS_RESTRINGIDAS = tuple(
+    normalizar(palabra.strip())
+    for palabra in os.environ.get(
+        "SIX_PALABRAS_RESTRINGIDAS",
+        "alcohol,cigarr,licor,cerveza,tabac,tabaq,vino"
+    ).split(",")
+    if palabra.strip()
+)
+
+# Una sola expresión compilada; se busca dentro de la categoría ya sin
+# acentos ni mayúsculas ("Cervezas Artesanales" -> restringido)
+_PATRON = re.compile("|".join(re.escape(p) for p in PALABRAS_RESTRINGIDAS)) if PALABRAS_RESTRINGIDAS else None
+
+@lru_cache(maxsize=1024)
+def es_categoria_restringida(categoria):
+    # Hay pocas categorías distintas, así que cada una se evalúa una vez
+    if not categoria or _PATRON is None:
+        return False
+    return _PATRON.search(normalizar(categoria)) is not None
+
+def es_producto_restringido(producto):
+    # El veredicto se guarda en el producto al escribirlo (campo
+    # `restringido`); los documentos viejos se clasifican al vuelo
+    restringido = producto.get("restringido")
+    if restringido is None:
+        return es_categoria_restringida(producto.get("category", ""))
+    return restringido
+
+def marcar_restringido(producto):
+    # Para usar en cualquier escritura de `productos`
+    producto["restringido"] = es_categoria_restringida(producto.get("category", ""))
+    return producto
+
+def clasificar_catalogo(coleccion, lote=1000):
+    # Guarda `restringido` en todos los productos cuyo veredicto cambió
+    # (al cambiar la configuración o para documentos viejos)
+    operaciones = []
+    actualizados = 0
+    for producto in coleccion.find({}, {"category": 1, "restringido": 1}):
+        veredicto = es_categoria_restringida(producto.get("category", ""))
+        if producto.get("restringido") is veredicto:
+            continue
+        operaciones.append(UpdateOne({"_id": producto["_id"]}, {"$set": {"restringido": veredicto}}))
+        if len(operaciones) >= lote:
+            actualizados += coleccion.bulk_write(operaciones, ordered=False).modified_count
+            operaciones = []
+    if operaciones:
+        actualizados += coleccion.bulk_write(operaciones, ordered=False).modified_count
+    if actualizados:
+        marcar_cambio(coleccion)
+    return actualizados
@@ -0,0 +1,16 @@
+from flask import current_app
+from werkzeug.local import LocalProxy
+
+from conexion import db
+
+# ------------------ DATOS COMPARTIDOS POR LAS VISTAS ------------------
+# Colecciones perezosas: el cliente se crea en el primer uso, uno por worker
+# (ver conexion.py), así que importar las vistas no toca MongoDB
+usuarios = db["usuarios"]
+productos = db["productos"]
+pagos = db["pagos"]
+resumenes = db["resumenes"]
+
+# Los arma create_app() según su configuración (backend del carrito)
+carritos = LocalProxy(lambda: current_app.extensions["six"]["carritos"])
+ordenes = LocalProxy(lambda: current_app.extensions["six"]["ordenes"])
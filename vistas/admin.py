@@ -0,0 +1,47 @@
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, session, url_for
+
+from analitica import refrescar_si_vieja, tablero
+from conexion import db
+from metricas import log
+
+bp = Blueprint("admin", __name__)
+
+def _dias():
+    try:
+        return min(max(int(request.args.get("dias", 30)), 1), 366)
+    except ValueError:
+        return 30
+
+def _datos_tablero():
+    datos = tablero(db, dias=_dias())
+    refrescar_si_vieja(db, datos["actualizado"])
+    return datos
+
+# ---------------------------------------------------------
+# ANALÍTICA DE VENTAS (DESDE LAS COLECCIONES DE RESUMEN)
+# ---------------------------------------------------------
+@bp.route("/admin/analitica")
+def analitica():
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+    if session["usuario"] not in current_app.config["ADMINS"]:
+        flash("❌ No tienes acceso a esta página")
+        return redirect(url_for("catalogo.inicio"))
+
+    try:
+        return render_template("admin_analitica.html",
+                               usuario=session["usuario"],
+                               **_datos_tablero())
+    except Exception:
+        log.exception("Error en analitica")
+        flash("❌ Error al cargar la analítica")
+        return redirect(url_for("catalogo.inicio"))
+
+@bp.route("/admin/analitica.json")
+def analitica_json():
+    if "usuario" not in session:
+        return jsonify(error="sesión expirada"), 401
+    if session["usuario"] not in current_app.config["ADMINS"]:
+        return jsonify(error="sin permiso"), 403
+
+    return jsonify(_datos_tablero())
@@ -0,0 +1,134 @@
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+import uuid
+
+from credenciales import HasheoSaturado, hashear_contrasena, verificar_contrasena
+from edad import es_mayor_de_edad, fecha_mayoria_edad
+from vistas import carritos, usuarios
+
+bp = Blueprint("autenticacion", __name__)
+
+MENSAJE_SATURADO = "⚠️ Hay muchos inicios de sesión en este momento, intenta de nuevo en unos segundos."
+
+# ---------------------------------------------------------
+# LOGIN
+# ---------------------------------------------------------
+@bp.route("/", methods=["GET", "POST"])
+def login():
+    mensaje = ""
+    if request.method == "POST":
+        usuario = request.form["usuario"].strip()
+        contrasena = request.form["contrasena"].strip()
+
+        user = usuarios.find_one({"usuario": usuario})
+        if user:
+            try:
+                ok, rehashear = verificar_contrasena(user.get("contrasena"), contrasena)
+            except HasheoSaturado:
+                return render_template("login.html", mensaje=MENSAJE_SATURADO)
+            if ok:
+                if rehashear:
+                    # Texto plano o costo viejo: se guarda con el hash actual.
+                    # Si el pool está saturado se deja para el próximo login.
+                    try:
+                        usuarios.update_one(
+                            {"_id": user["_id"]},
+                            {"$set": {"contrasena": hashear_contrasena(contrasena)}}
+                        )
+                    except HasheoSaturado:
+                        pass
+                session["usuario"] = usuario
+                session["carrito_id"] = uuid.uuid4().hex
+                session["mayor_edad"] = es_mayor_de_edad(user)
+                flash("✅ ¡Bienvenido a Six!")
+                return redirect(url_for("catalogo.inicio"))
+            else:
+                mensaje = "⚠️ Contraseña incorrecta"
+        else:
+            mensaje = "⚠️ Usuario no encontrado"
+
+    return render_template("login.html", mensaje=mensaje)
+
+# ---------------------------------------------------------
+# RECUPERAR CONTRASEÑA
+# ---------------------------------------------------------
+@bp.route("/recuperar-contrasena", methods=["GET", "POST"])
+def recuperar_contrasena():
+    mensaje = ""
+    if request.method == "POST":
+        usuario = request.form["usuario"].strip()
+        user = usuarios.find_one({"usuario": usuario})
+        
+        if user:
+            mensaje = "✅ Se ha enviado un enlace de recuperación a tu correo registrado"
+        else:
+            mensaje = "❌ Usuario no encontrado"
+    
+    return render_template("recuperar_contrasena.html", mensaje=mensaje)
+
+# ---------------------------------------------------------
+# REGISTRO
+# ---------------------------------------------------------
+@bp.route("/registro", methods=["GET", "POST"])
+def registro():
+    mensaje = ""
+    if request.method == "POST":
+        usuario = request.form["usuario"].strip()
+        contrasena = request.form["contrasena"].strip()
+        confirmar = request.form["confirmar"].strip()
+        fecha_nacimiento_str = request.form.get("fecha_nacimiento", "")
+        verificacion_edad = request.form.get("verificacion_edad") == "on"
+        terminos = request.form.get("terminos") == "on"
+
+        if not all([usuario, contrasena, confirmar, fecha_nacimiento_str]):
+            mensaje = "Por favor completa todos los campos obligatorios."
+        elif contrasena != confirmar:
+            mensaje = "Las contraseñas no coinciden."
+        elif len(contrasena) < 6:
+            mensaje = "La contraseña debe tener al menos 6 caracteres."
+        elif usuarios.find_one({"usuario": usuario}):
+            mensaje = "Este nombre de usuario ya existe."
+        elif not verificacion_edad:
+            mensaje = "Debes confirmar que eres mayor de 18 años."
+        elif not terminos:
+            mensaje = "Debes aceptar los términos y condiciones."
+        else:
+            try:
+                fecha_nacimiento = datetime.strptime(fecha_nacimiento_str, "%Y-%m-%d")
+                mayor_desde = fecha_mayoria_edad(fecha_nacimiento)
+                
+                if mayor_desde > datetime.now():
+                    mensaje = "Debes ser mayor de 18 años para registrarte en Six."
+                else:
+                    usuarios.insert_one({
+                        "usuario": usuario,
+                        "contrasena": hashear_contrasena(contrasena),
+                        "fecha_nacimiento": fecha_nacimiento,
+                        "mayor_desde": mayor_desde,
+                        "fecha_registro": datetime.now()
+                    })
+                    flash("✅ Registro exitoso. Ahora puedes iniciar sesión.")
+                    return redirect(url_for("autenticacion.login"))
+                    
+            except HasheoSaturado:
+                mensaje = MENSAJE_SATURADO
+            except DuplicateKeyError:
+                # Otro registro con el mismo nombre ganó entre el find_one y
+                # el insert (índice usuario_unico)
+                mensaje = "Este nombre de usuario ya existe."
+            except ValueError as e:
+                mensaje = f"Formato de fecha inválido: {str(e)}"
+
+    return render_template("registro.html", mensaje=mensaje)
+
+# ---------------------------------------------------------
+# LOGOUT
+# ---------------------------------------------------------
+@bp.route("/logout")
+def logout():
+    if "carrito_id" in session:
+        carritos.vaciar(session["carrito_id"])
+    session.clear()
+    flash("✅ Sesión cerrada correctamente")
+    return redirect(url_for("autenticacion.login"))
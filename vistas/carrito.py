@@ -0,0 +1,155 @@
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from bson import ObjectId
+import uuid
+
+from catalogo import obtener_producto
+from imagenes import miniatura
+from metricas import log
+from restricciones import es_producto_restringido
+from vistas import carritos, productos
+
+bp = Blueprint("carrito", __name__)
+
+# ------------------ FUNCIONES AUXILIARES ------------------
+def id_carrito():
+    if "carrito_id" not in session:
+        session["carrito_id"] = uuid.uuid4().hex
+    return session["carrito_id"]
+
+PROYECCION_CARRITO = {"name": 1, "price": 1, "img": 1, "miniaturas": 1, "category": 1, "restringido": 1}
+
+def cotizar_carrito(items):
+    # items: {producto_id: cantidad} tal como lo guarda el almacén.
+    # Una sola consulta $in con precios vigentes; total y restricciones
+    # se calculan en la misma pasada. Lo usan el carrito y el pago.
+    ids = [ObjectId(producto_id) for producto_id in items if ObjectId.is_valid(producto_id)]
+    encontrados = {}
+    if ids:
+        encontrados = {
+            str(doc["_id"]): doc
+            for doc in productos.find({"_id": {"$in": ids}}, PROYECCION_CARRITO)
+        }
+
+    carrito = []
+    restringidos = []
+    total = 0
+    for producto_id, cantidad in items.items():
+        producto = encontrados.get(producto_id)
+        if not producto:
+            continue
+        item = {
+            "_id": producto_id,
+            "name": producto["name"],
+            "price": float(producto["price"]),
+            "img": miniatura(producto, 160) or "https://via.placeholder.com/120",
+            "category": producto.get("category", ""),
+            "cantidad": cantidad,
+            "restringido": es_producto_restringido(producto)
+        }
+        total += item["price"] * cantidad
+        carrito.append(item)
+        if item["restringido"]:
+            restringidos.append(item)
+    return carrito, total, restringidos
+
+# ---------------------------------------------------------
+# AGREGAR CARRITO
+# ---------------------------------------------------------
+@bp.route("/agregar_carrito/<producto_id>", methods=["POST"])
+def agregar_carrito(producto_id):
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+
+    try:
+        producto = obtener_producto(productos, producto_id)
+        if not producto:
+            flash("❌ Producto no encontrado")
+            return redirect(url_for("catalogo.inicio"))
+        
+        # Verificación edad
+        if es_producto_restringido(producto) and not session.get("mayor_edad", False):
+            flash("❌ Debes ser mayor de 18 años para comprar este producto.")
+            return redirect(url_for("catalogo.producto_detalle", producto_id=producto_id))
+
+        # Si ya existe, $inc aumenta la cantidad
+        carritos.agregar(id_carrito(), producto_id)
+        flash(f"✅ {producto['name']} agregado al carrito")
+        return redirect(url_for("carrito.carrito"))
+        
+    except Exception:
+        log.exception("Error en agregar_carrito")
+        flash("❌ Error al agregar producto al carrito")
+        return redirect(url_for("catalogo.inicio"))
+
+# ---------------------------------------------------------
+# CARRITO
+# ---------------------------------------------------------
+@bp.route("/carrito")
+def carrito():
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+        
+    try:
+        carrito, total, restringidos = cotizar_carrito(carritos.obtener(id_carrito()))
+        
+        return render_template("carrito.html", 
+                             carrito=carrito, 
+                             total=total, 
+                             usuario=session.get("usuario"),
+                             mayor_edad=session.get("mayor_edad", False),
+                             productos_restringidos=bool(restringidos))
+    except Exception:
+        log.exception("Error en carrito")
+        flash("❌ Error al cargar el carrito")
+        return redirect(url_for("catalogo.inicio"))
+
+# ---------------------------------------------------------
+# ACTUALIZAR CANTIDAD
+# ---------------------------------------------------------
+@bp.route("/actualizar_cantidad/<producto_id>", methods=["POST"])
+def actualizar_cantidad(producto_id):
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+
+    try:
+        nueva_cantidad = int(request.form["cantidad"])
+        carritos.actualizar(id_carrito(), producto_id, max(1, nueva_cantidad))
+        return redirect(url_for("carrito.carrito"))
+    except Exception:
+        log.exception("Error en actualizar_cantidad")
+        flash("❌ Error al actualizar cantidad")
+        return redirect(url_for("carrito.carrito"))
+
+# ---------------------------------------------------------
+# ELIMINAR DEL CARRITO
+# ---------------------------------------------------------
+@bp.route("/eliminar_carrito/<producto_id>", methods=["POST"])
+def eliminar_carrito(producto_id):
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+        
+    try:
+        carritos.eliminar(id_carrito(), producto_id)
+        flash("✅ Producto eliminado del carrito")
+        return redirect(url_for("carrito.carrito"))
+    except Exception:
+        log.exception("Error en eliminar_carrito")
+        flash("❌ Error al eliminar producto")
+        return redirect(url_for("carrito.carrito"))
+
+# ---------------------------------------------------------
+# VACIAR CARRITO
+# ---------------------------------------------------------
+@bp.route("/vaciar_carrito", methods=["POST"])
+def vaciar_carrito():
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+        
+    try:
+        carritos.vaciar(id_carrito())
+        flash("✅ Carrito vaciado")
+        return redirect(url_for("carrito.carrito"))
+    except Exception:
+        log.exception("Error en vaciar_carrito")
+        flash("❌ Error al vaciar carrito")
+        return redirect(url_for("carrito.carrito"))
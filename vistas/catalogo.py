@@ -0,0 +1,138 @@
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+
+from busqueda import buscar_productos
+from catalogo import modificado_catalogo, obtener_producto, paginar_productos, version_catalogo
+from fragmentos import clave_grilla, fragmento, respuesta_condicional
+from metricas import log
+from restricciones import es_producto_restringido
+from vistas import productos
+
+bp = Blueprint("catalogo", __name__)
+
+# ---------------------------------------------------------
+# PÁGINAS DEL CATÁLOGO (GRILLA CACHEADA + GET CONDICIONAL)
+# ---------------------------------------------------------
+def pagina_catalogo(filtro=None, **contexto):
+    # La grilla es igual para todos los usuarios con la misma bandera de
+    # edad: se renderiza una vez por página y versión del catálogo, y aquí
+    # solo se pinta el resto de inicio.html (navbar con el usuario)
+    version = version_catalogo(productos)
+    mayor_edad = session.get("mayor_edad", False)
+
+    def renderizar_grilla():
+        productos_list, siguiente, anterior = paginar_productos(
+            productos,
+            filtro,
+            despues=request.args.get("despues"),
+            antes=request.args.get("antes")
+        )
+        return render_template("_grilla_productos.html",
+                               productos=productos_list,
+                               mayor_edad=mayor_edad,
+                               siguiente=siguiente,
+                               anterior=anterior)
+
+    def renderizar():
+        return render_template("inicio.html",
+                               grilla=fragmento(clave_grilla(version, mayor_edad), renderizar_grilla),
+                               usuario=session["usuario"],
+                               mayor_edad=mayor_edad,
+                               **contexto)
+
+    return respuesta_condicional(
+        ("catalogo", version, request.full_path, session["usuario"], mayor_edad),
+        modificado_catalogo(productos),
+        renderizar
+    )
+
+# ---------------------------------------------------------
+# INICIO - LISTA DE PRODUCTOS (CATEGORÍAS INTEGRADAS)
+# ---------------------------------------------------------
+@bp.route("/inicio")
+def inicio():
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+
+    try:
+        return pagina_catalogo()
+    except Exception:
+        log.exception("Error en inicio")
+        flash("❌ Error al cargar los productos")
+        return redirect(url_for("autenticacion.login"))
+
+# ---------------------------------------------------------
+# BUSCADOR
+# ---------------------------------------------------------
+@bp.route("/buscar")
+def buscar():
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+
+    try:
+        q = request.args.get("q", "").strip()
+
+        productos_list = buscar_productos(productos, q)
+
+        if not productos_list:
+            flash("No se encontraron productos para tu búsqueda.")
+
+        return render_template("inicio.html",
+                               productos=productos_list,
+                               usuario=session["usuario"],
+                               mayor_edad=session.get("mayor_edad", False),
+                               busqueda=q)
+    except Exception:
+        log.exception("Error en buscar")
+        flash("❌ Error en la búsqueda")
+        return redirect(url_for("catalogo.inicio"))
+
+# ---------------------------------------------------------
+# FILTRO POR CATEGORÍA (CON "todo")
+# ---------------------------------------------------------
+@bp.route("/categoria/<category>")
+def categoria(category):
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+
+    try:
+        filtro = {} if category.lower() == "todo" else {"category": category}
+        return pagina_catalogo(filtro, categoria=category)
+    except Exception:
+        log.exception("Error en categoría")
+        flash("❌ Error al cargar la categoría")
+        return redirect(url_for("catalogo.inicio"))
+
+# ---------------------------------------------------------
+# DETALLE PRODUCTO
+# ---------------------------------------------------------
+@bp.route("/producto/<producto_id>")
+def producto_detalle(producto_id):
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+
+    try:
+        mayor_edad = session.get("mayor_edad", False)
+
+        def renderizar():
+            producto = obtener_producto(productos, producto_id)
+            if not producto:
+                flash("❌ Producto no encontrado")
+                return redirect(url_for("catalogo.inicio"))
+
+            restringido = es_producto_restringido(producto)
+
+            return render_template("producto.html",
+                                 producto=producto,
+                                 usuario=session["usuario"],
+                                 mayor_edad=mayor_edad,
+                                 restringido=restringido)
+
+        return respuesta_condicional(
+            ("producto", version_catalogo(productos), producto_id, session["usuario"], mayor_edad),
+            modificado_catalogo(productos),
+            renderizar
+        )
+    except Exception:
+        log.exception("Error en producto_detalle")
+        flash("❌ Error al cargar el producto")
+        return redirect(url_for("catalogo.inicio"))
@@ -0,0 +1,55 @@
+from flask import Blueprint, Response, jsonify
+
+from assets import respuesta_asset
+from catalogo import cache_catalogo
+from conexion import estadisticas_pool
+from fragmentos import cache_fragmentos
+from imagenes import respuesta_miniatura
+from metricas import texto_prometheus
+from vistas import productos
+
+bp = Blueprint("estado", __name__)
+
+# ---------------------------------------------------------
+# ASSETS CON HUELLA (CACHE INMUTABLE)
+# ---------------------------------------------------------
+@bp.route("/assets/<path:archivo>")
+def servir_asset(archivo):
+    return respuesta_asset(archivo)
+
+@bp.route("/miniaturas/<nombre>")
+def servir_miniatura(nombre):
+    return respuesta_miniatura(nombre)
+
+# ---------------------------------------------------------
+# ESTADO DE LA CACHÉ (MONITOREO)
+# ---------------------------------------------------------
+@bp.route("/estado/cache")
+def estado_cache():
+    return jsonify(catalogo=cache_catalogo(productos).estadisticas(),
+                   fragmentos=cache_fragmentos().estadisticas())
+
+@bp.route("/estado/mongo")
+def estado_mongo():
+    return jsonify(pool=estadisticas_pool())
+
+# ---------------------------------------------------------
+# MÉTRICAS (FORMATO DE TEXTO DE PROMETHEUS)
+# ---------------------------------------------------------
+@bp.route("/metricas")
+def metricas():
+    indicadores = []
+    for cache, estadisticas in (("catalogo", cache_catalogo(productos).estadisticas()),
+                                ("fragmentos", cache_fragmentos().estadisticas())):
+        for campo in ("aciertos", "fallos", "expulsiones"):
+            indicadores.append((f"six_cache_{campo}_total", "counter", f"{campo.capitalize()} de la caché",
+                                {"cache": cache}, estadisticas[campo]))
+        indicadores.append(("six_cache_entradas", "gauge", "Entradas en la caché",
+                            {"cache": cache}, estadisticas["entradas"]))
+    pool = estadisticas_pool()
+    for campo in ("abiertas", "en_uso", "esperando"):
+        indicadores.append((f"six_mongo_conexiones_{campo}", "gauge", f"Conexiones de MongoDB {campo.replace('_', ' ')}",
+                            {}, pool[campo]))
+    indicadores.append(("six_mongo_checkouts_fallidos_total", "counter", "Checkouts del pool que fallaron",
+                        {}, pool["checkouts_fallidos"]))
+    return Response(texto_prometheus(indicadores), mimetype="text/plain; version=0.0.4")
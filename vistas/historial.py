@@ -0,0 +1,39 @@
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, session, url_for
+
+from historial import detalle_orden, obtener_resumen, pagina_historial
+from metricas import log
+from vistas import pagos, resumenes
+
+bp = Blueprint("historial", __name__)
+
+# ---------------------------------------------------------
+# HISTORIAL
+# ---------------------------------------------------------
+@bp.route("/historial")
+def historial():
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+        
+    try:
+        antes = request.args.get("antes")
+        compras, siguiente = pagina_historial(pagos, session["usuario"], antes=antes)
+        return render_template("historial.html", 
+                             compras=compras, 
+                             usuario=session["usuario"],
+                             resumen=obtener_resumen(resumenes, pagos, session["usuario"]),
+                             antes=antes,
+                             siguiente=siguiente)
+    except Exception:
+        log.exception("Error en historial")
+        flash("❌ Error al cargar el historial")
+        return redirect(url_for("catalogo.inicio"))
+
+@bp.route("/historial/<numero_orden>")
+def historial_detalle(numero_orden):
+    if "usuario" not in session:
+        return jsonify(error="sesión expirada"), 401
+
+    orden = detalle_orden(pagos, session["usuario"], numero_orden)
+    if not orden:
+        return jsonify(error="orden no encontrada"), 404
+    return jsonify(orden)
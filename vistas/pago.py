@@ -0,0 +1,163 @@
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from datetime import datetime
+import re
+import uuid
+
+from checkout import StockInsuficiente, buscar_pago_previo, procesar_pago, programar_limpieza
+from historial import registrar_en_resumen
+from metricas import log
+from vistas import carritos, ordenes, pagos, productos, resumenes
+from vistas.carrito import cotizar_carrito, id_carrito
+
+bp = Blueprint("pago", __name__)
+
+def generar_numero_orden():
+    return ordenes.siguiente()
+
+def respuesta_pago_previo(previo):
+    # Otro envío con la misma clave: todavía en curso, ya cobrado, o fallido
+    # y borrado (None)
+    if previo is None:
+        flash("❌ No se pudo completar el pago, intenta de nuevo")
+        return redirect(url_for("carrito.carrito"))
+    if previo.get("estado") == "pendiente":
+        flash("⏳ Tu pago se está procesando")
+        return redirect(url_for("carrito.carrito"))
+    return render_template("pago_exitoso.html",
+                         total=previo["total"],
+                         usuario=session["usuario"],
+                         numero_orden=previo["numero_orden"])
+
+def despues_del_cobro(orden):
+    # La orden ya está confirmada y el stock apartado: si algo de aquí
+    # falla se registra, pero el pago no puede responder error, o el cliente
+    # reintenta con otra clave y paga dos veces
+    try:
+        registrar_en_resumen(resumenes, pagos, orden)
+    except Exception:
+        log.exception("Orden %s cobrada sin actualizar el resumen "
+                      "(flask --app app reconstruir-resumenes lo corrige)", orden["numero_orden"])
+    try:
+        carritos.vaciar(id_carrito())
+    except Exception:
+        log.exception("Orden %s cobrada sin vaciar el carrito", orden["numero_orden"])
+
+# ---------------------------------------------------------
+# PAGO
+# ---------------------------------------------------------
+@bp.route("/pago", methods=["GET", "POST"])
+def pago():
+    if "usuario" not in session:
+        log.debug("/pago sin usuario en sesión")
+        return redirect(url_for("autenticacion.login"))
+
+    # Doble envío o reintento del mismo formulario: se muestra la orden ya
+    # registrada en lugar de cobrar otra vez
+    if request.method == "POST":
+        previo = buscar_pago_previo(pagos, session["usuario"], request.form.get("clave_pago"))
+        if previo:
+            return respuesta_pago_previo(previo)
+
+    programar_limpieza(pagos, productos)
+    carrito, total, productos_restringidos = cotizar_carrito(carritos.obtener(id_carrito()))
+    log.debug("/pago: carrito con %d productos", len(carrito))
+    
+    if not carrito:
+        flash("❌ Tu carrito está vacío")
+        return redirect(url_for("catalogo.inicio"))
+    
+    if productos_restringidos and not session.get("mayor_edad", False):
+        flash("❌ No puedes comprar productos restringidos sin verificar tu edad")
+        return redirect(url_for("carrito.carrito"))
+
+    if request.method == "POST":
+        try:
+            nombre = request.form.get("nombre", "").strip()
+            tarjeta = request.form.get("tarjeta", "").strip()
+            cvv = request.form.get("cvv", "").strip()
+            fecha = request.form.get("fecha", "").strip()
+
+            if not all([nombre, tarjeta, cvv, fecha]):
+                flash("❌ Por favor completa todos los campos")
+                return redirect(url_for("pago.pago"))
+            
+            tarjeta_limpia = re.sub(r'\s+', '', tarjeta)
+            
+            if not re.match(r'^\d{13,19}$', tarjeta_limpia):
+                flash("❌ Número de tarjeta inválido")
+                return redirect(url_for("pago.pago"))
+                
+            if not re.match(r'^\d{3,4}$', cvv):
+                flash("❌ CVV inválido")
+                return redirect(url_for("pago.pago"))
+
+            if not re.match(r'^(0[1-9]|1[0-2])\/[0-9]{2}$', fecha):
+                flash("❌ Formato de fecha inválido (MM/AA)")
+                return redirect(url_for("pago.pago"))
+
+            numero_orden = generar_numero_orden()
+
+            pago_data = {
+                "usuario": session["usuario"],
+                "carrito": carrito,
+                "total": total,
+                "nombre_tarjeta": nombre,
+                "numero_tarjeta": tarjeta_limpia[-4:],
+                "fecha_exp": fecha,
+                "fecha_compra": datetime.now(),
+                "productos_restringidos": len(productos_restringidos) > 0,
+                "numero_orden": numero_orden
+            }
+            
+            clave_pago = request.form.get("clave_pago") or uuid.uuid4().hex
+            orden, nueva = procesar_pago(pagos, productos, clave_pago, pago_data)
+            if not nueva:
+                # Perdió la carrera contra otro envío con la misma clave
+                return respuesta_pago_previo(orden)
+            despues_del_cobro(orden)
+
+            return render_template("pago_exitoso.html", 
+                                 total=orden["total"], 
+                                 usuario=session["usuario"],
+                                 numero_orden=orden["numero_orden"])
+
+        except StockInsuficiente as e:
+            flash(f"❌ Ya no hay suficientes unidades de {e.item['name']}")
+            return redirect(url_for("carrito.carrito"))
+        except Exception:
+            log.exception("Error al procesar el pago")
+            flash("❌ Error al procesar el pago.")
+            return redirect(url_for("pago.pago"))
+
+    return render_template("pago.html", 
+                         carrito=carrito, 
+                         total=total,
+                         productos_restringidos=len(productos_restringidos) > 0,
+                         clave_pago=uuid.uuid4().hex)
+
+# ---------------------------------------------------------
+# PAGO EXITOSO
+# ---------------------------------------------------------
+@bp.route("/pago_exitoso")
+def pago_exitoso():
+    if "usuario" not in session:
+        return redirect(url_for("autenticacion.login"))
+    
+    try:
+        ultima_compra = pagos.find_one(
+            {"usuario": session["usuario"], "estado": {"$ne": "pendiente"}},
+            sort=[("fecha_compra", -1)]
+        )
+        
+        if not ultima_compra:
+            flash("❌ No se encontró información de pago")
+            return redirect(url_for("catalogo.inicio"))
+        
+        return render_template("pago_exitoso.html",
+                             total=ultima_compra["total"],
+                             usuario=session["usuario"],
+                             numero_orden=ultima_compra.get("numero_orden") or str(ultima_compra["_id"]))
+    except Exception:
+        log.exception("Error en pago_exitoso")
+        flash("❌ Error al cargar la página")
+        return redirect(url_for("catalogo.inicio"))